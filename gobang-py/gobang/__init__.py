@@ -0,0 +1,14 @@
+"""
+Multiplayer Gobang (1-4 players): rules, win detection and AI.
+
+The package is headless.  Importing it never opens a window, reads input
+or starts a game, so servers, benchmarks and worker processes can use
+Gobang directly.  The front ends are separate modules:
+
+    python -m gobang         play in the console (gobang.cli)
+    python -m gobang --tk    play in a tkinter window (gobang.gui)
+"""
+
+from .game import Gobang
+
+__all__ = ['Gobang']
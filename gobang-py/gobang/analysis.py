@@ -0,0 +1,237 @@
+"""
+Persistent cache of analysed positions, shared across runs and processes.
+
+    game = Gobang(players=2, cache='analysis.db')
+    python -m gobang.analysis analysis.db --stats
+    python -m gobang.analysis analysis.db --compact --max-entries 500000
+
+AnalysisCache keeps the result of every finished alpha-beta search and every
+forced win found by the threat solver in an SQLite file: the best move, its
+score, the depth searched and whether the result is proven.  Only the
+solver's forced wins count as proven: the alpha-beta search only tries the
+best few candidates at each node, so even a score past WON may have missed
+a defence.  get_ai_move looks the position up before it searches and plays
+the stored move when the entry is a proven win or was searched at least as
+deep as the level asks for.  A proven win is never replaced, and other
+entries only by a proven win or a search at least as deep.
+
+Entries are keyed by a canonical position key XOR the rules hash of the
+opening book (size, players, win_condition and the limits table).  The
+canonical key is the smallest Zobrist key over the eight rotations and
+reflections of the board that leave every pending first-move region in
+place, so mirrored positions share one entry; the stored move is kept in
+the canonical orientation and turned back on lookup.  The key is SQLite's
+integer primary key, so a lookup is one B-tree search however large the
+file grows.
+
+Every entry records when it was last stored or read.  Once the file holds
+more than max_entries positions the least recently used ones are deleted,
+and compact() also gives the freed pages back to the file system.
+"""
+
+import os
+import sys
+import time
+
+from .book import rules_key
+
+MAX_ENTRIES = 2000000
+EVICT_EVERY = 1000  # Stores between checks of the entry count
+KEEP = 0.9  # Fraction of max_entries left after an eviction
+
+WIN, UNPROVEN = 1, 0  # proven: a forced win for the player to move, or not proven
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key INTEGER PRIMARY KEY,  -- canonical Zobrist key ^ rules hash, as a signed 64-bit integer
+    move INTEGER NOT NULL,  -- cell index in the canonical orientation
+    score INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    proven INTEGER NOT NULL,
+    used INTEGER NOT NULL  -- Unix time of the last store or hit
+);
+CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used);
+"""
+
+_symmetries = {}  # Board size -> list of (forward, backward) cell index permutations
+
+
+def symmetries(size):
+    """The eight rotations and reflections of a size x size board as (forward, backward) index lists."""
+    if size not in _symmetries:
+        last = size - 1
+        maps = [
+            lambda r, c: (r, c), lambda r, c: (c, last - r), lambda r, c: (last - r, last - c),
+            lambda r, c: (last - c, r), lambda r, c: (c, r), lambda r, c: (r, last - c),
+            lambda r, c: (last - r, c), lambda r, c: (last - c, last - r),
+        ]
+        result = []
+        for transform in maps:
+            forward = [0] * (size * size)
+            backward = [0] * (size * size)
+            for index in range(size * size):
+                row, col = transform(*divmod(index, size))
+                forward[index] = row * size + col
+                backward[row * size + col] = index
+            result.append((forward, backward))
+        _symmetries[size] = result
+    return _symmetries[size]
+
+
+def _keeps_region(forward, region, size):
+    # A rectangle maps onto a rectangle, so comparing the images of two opposite corners is enough
+    row_min, row_max, col_min, col_max = region
+    a = divmod(forward[row_min * size + col_min], size)
+    b = divmod(forward[(row_max - 1) * size + col_max - 1], size)
+    return (min(a[0], b[0]), max(a[0], b[0]) + 1, min(a[1], b[1]), max(a[1], b[1]) + 1) == tuple(region)
+
+
+def canonical(game):
+    """(canonical key, forward, backward): the smallest key over the allowed symmetries and its permutations."""
+    size = game.size
+    regions = [game.first_move_region(player) for player in range(game.players)]
+    regions = [region for region in regions if region]
+    cells = game.zobrist.cells
+    owners = game.bits.cells
+    best = None
+    for forward, backward in symmetries(size):
+        if any(not _keeps_region(forward, region, size) for region in regions):
+            continue
+        key = game.zobrist.turn[game.current_player]
+        for index in game.history:
+            key ^= cells[owners[index]][forward[index]]
+        if best is None or key < best[0]:
+            best = (key, forward, backward)
+    return best
+
+
+def _signed(key):
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class AnalysisCache:
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        import threading  # Only loaded when a cache is used, like sqlite3
+
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None  # Opened on first use
+        self.lock = threading.Lock()  # One connection shared by every thread of the process
+        self.stores = 0
+        self.hits = self.misses = 0
+
+    def _connect(self):
+        import sqlite3  # Only loaded when a cache is used
+
+        self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')  # Readers in other processes never wait for a writer
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+
+    def lookup(self, game):
+        """{'move', 'score', 'depth', 'proven'} stored for this position, or None.  move is a cell index, proven a bool."""
+        key, _, backward = canonical(game)
+        key = _signed(key ^ rules_key(game))
+        with self.lock:
+            connection = self.connection or self._connect()
+            row = connection.execute('SELECT move, score, depth, proven FROM analysis WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute('UPDATE analysis SET used = ? WHERE key = ?', (int(time.time()), key))
+        move = backward[row[0]]
+        region = game.first_move_region(game.current_player)
+        if not game.bits.is_empty(move) or region and not game.is_move_allowed(game.current_player, *divmod(move, game.size)):
+            self.misses += 1
+            return None  # Hash collision: not a legal move here
+        self.hits += 1
+        return {'move': move, 'score': row[1], 'depth': row[2], 'proven': bool(row[3])}
+
+    def store(self, game, move, score, depth, proven=False):
+        """
+        Record the analysis of the current position; proven=True for a forced win found by the threat solver.
+        A proven entry is never replaced; any other one only by a proven or at least as deep one.
+        """
+        proven = WIN if proven else UNPROVEN
+        key, forward, _ = canonical(game)
+        key = _signed(key ^ rules_key(game))
+        with self.lock:
+            connection = self.connection or self._connect()
+            connection.execute(
+                'INSERT INTO analysis (key, move, score, depth, proven, used) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET move = excluded.move, score = excluded.score, '
+                'depth = excluded.depth, proven = excluded.proven, used = excluded.used '
+                'WHERE analysis.proven != 1 AND (excluded.proven = 1 OR excluded.depth >= analysis.depth)',
+                (key, forward[move], score, depth, proven, int(time.time())))
+            self.stores += 1
+            if self.stores % EVICT_EVERY == 0:
+                self._evict(self.max_entries)
+
+    def _evict(self, max_entries):
+        connection = self.connection
+        count = connection.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+        if count <= max_entries:
+            return 0
+        excess = count - int(max_entries * KEEP)
+        connection.execute('DELETE FROM analysis WHERE key IN (SELECT key FROM analysis ORDER BY used LIMIT ?)', (excess,))
+        return excess
+
+    def evict(self, max_entries=None):
+        """Delete the least recently used entries beyond max_entries; returns how many were deleted."""
+        with self.lock:
+            if self.connection is None:
+                self._connect()
+            return self._evict(self.max_entries if max_entries is None else max_entries)
+
+    def compact(self, max_entries=None):
+        """Evict, then rebuild the file so it only takes the space its entries need."""
+        removed = self.evict(max_entries)
+        with self.lock:
+            self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.connection.execute('VACUUM')
+        return removed
+
+    def stats(self):
+        with self.lock:
+            connection = self.connection or self._connect()
+            entries, proven = connection.execute('SELECT COUNT(*), COUNT(*) FILTER (WHERE proven = 1) FROM analysis').fetchone()
+        return {
+            'entries': entries,
+            'proven': proven,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m gobang.analysis', description="Inspect or shrink an analysis cache")
+    parser.add_argument('path', help="SQLite file made by Gobang(cache=...)")
+    parser.add_argument('--stats', action='store_true', help="print the entry count and file size")
+    parser.add_argument('--compact', action='store_true', help="evict old entries and rebuild the file")
+    parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES)
+    args = parser.parse_args(argv)
+
+    cache = AnalysisCache(args.path, args.max_entries)
+    if args.compact:
+        started = time.perf_counter()
+        removed = cache.compact()
+        print(f"removed {removed} entries in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if args.stats or not args.compact:
+        stats = cache.stats()
+        print(f"{stats['entries']} entries, {stats['proven']} proven, {stats['bytes']} bytes")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
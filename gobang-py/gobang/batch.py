@@ -0,0 +1,223 @@
+"""
+Batch analysis of recorded games.
+
+    python -m gobang.batch games/ --out analysis.jsonl
+    cat games.gbr | python -m gobang.batch - --level 2 --workers 8 > analysis.jsonl
+
+Every game of the given record files (binary or text, see record.py),
+directories of them, or standard input ('-') is replayed through the
+engine.  For each move the pipeline reports the engine's preferred move
+and its score, how much score the move actually played gave up against
+it, and whether the player had a forced win (found by the threat solver,
+two players only) that the move did not start.  A game that cannot be
+read or replayed gets a line of type "error" and the run goes on.
+
+The stages are generators: records are read one at a time, grouped into
+chunks of games and handed to a process pool, with at most two chunks per
+worker in flight.  Results come back in input order and are written as one
+JSON line per game as soon as their chunk is done, so memory use does not
+depend on the size of the corpus.  A summary line with the game count and
+games per second ends the output.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .game import Gobang
+from .record import MAGIC, GameRecord, cell_name, read_encoded, read_text_games
+from .search import LEVELS, WIN_SCORE
+
+_games = {}  # Worker cache: (size, players, win_condition) -> Gobang
+
+
+def iter_sources(paths):
+    """Yield (name, binary file) for every path; directories are walked in name order, '-' is standard input."""
+    for path in paths:
+        if path == '-':
+            yield '-', sys.stdin.buffer
+        elif os.path.isdir(path):
+            for folder, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    with open(os.path.join(folder, name), 'rb') as file:
+                        yield os.path.join(folder, name), file
+        else:
+            with open(path, 'rb') as file:
+                yield path, file
+
+
+def iter_games(paths):
+    """
+    Yield (source, number in source, game) for every game, reading one at a time.
+    A game is its encoded bytes or its text: the workers decode it, so one bad game does not stop the others.
+    """
+    for source, file in iter_sources(paths):
+        if file.peek(len(MAGIC))[:len(MAGIC)] == MAGIC:
+            yield from ((source, number, data) for number, data in enumerate(read_encoded(file)))
+        else:
+            text = io.TextIOWrapper(file, encoding='utf-8')
+            yield from ((source, number, game) for number, game in enumerate(read_text_games(text)))
+            text.detach()  # Leave the file itself to its owner
+
+
+def chunked(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _game_for(record):
+    key = (record.size, record.players, record.win_condition)
+    game = _games.get(key)
+    if game is None:
+        game = _games[key] = Gobang(record.size, record.players, record.win_condition, table_mb=4, book=None)
+    while game.history:
+        game.undo()
+    game.player_limits = dict(record.limits)
+    game.engine.table.clear()  # Games are analysed independently of each other
+    return game
+
+
+def analyze_move(game, played, level, budget):
+    """Engine verdict on the position before `played`, for the player to move."""
+    # The preferred move is found in the same order as get_ai_move: a winning cell, a forced win, the search
+    # The time limit covers finding the preferred move, solver included, and again scoring the move played
+    settings = dict(LEVELS.get(level, LEVELS[max(LEVELS)]), **budget)
+    time_limit = settings['time_limit']
+    started = time.perf_counter()
+    player = game.current_player
+    wins = game.threats.wins[player]
+    forced = game.solver.solve(time_limit=time_limit)
+    engine = game.engine
+    depth = 0
+    if wins:
+        best = min(wins)
+    elif forced is not None:
+        best = forced
+    else:
+        best = engine.search(level, **dict(budget, time_limit=max(0.0, time_limit - (time.perf_counter() - started))))
+        if best is None:
+            return None
+        depth = engine.info.get('depth', 0)
+    best_score = WIN_SCORE if wins or forced is not None else engine.info.get('score', 0)
+    # A move other than the preferred one may start a forced win too; only one the solver cannot prove is a miss
+    started = time.perf_counter()
+    keeps_win = played == best or played in wins \
+        or (bool(wins) or forced is not None) and game.solver.proves(played, time_limit=time_limit)
+    if keeps_win:
+        played_score = best_score
+    else:
+        played_score, _, _, finished, _ = engine.search_moves([played], max(depth, 1), settings['width'],
+                                                           max(0.0, time_limit - (time.perf_counter() - started)),
+                                                           settings['node_limit'])
+        if not finished:
+            played_score = None  # Out of budget: the loss is unknown
+    return {
+        'player': player,
+        'move': cell_name(played, game.size),
+        'best': cell_name(best, game.size),
+        'score': best_score,
+        'depth': depth,
+        'loss': max(0, best_score - played_score) if played_score is not None else None,
+        'forced_win': cell_name(forced, game.size) if forced is not None else None,
+        'missed_win': (bool(wins) or forced is not None) and not keeps_win,
+    }
+
+
+def analyze_game(source, number, data, level=1, budget=None):
+    """The JSONL record of one game (encoded bytes or text): its rules, result and one entry per move."""
+    started = time.perf_counter()
+    try:
+        record = GameRecord.decode(data) if isinstance(data, bytes) else GameRecord.from_text(data)
+        return _analyze_record(source, number, record, level, budget, started)
+    except Exception as error:  # Reported on the game's own line, so the rest of the batch goes on
+        _games.clear()  # The failed game may have left a board half-played
+        return {'type': 'error', 'source': source, 'game': number, 'error': f"{type(error).__name__}: {error}",
+                'moves': [], 'time': time.perf_counter() - started}
+
+
+def _analyze_record(source, number, record, level, budget, started):
+    game = _game_for(record)
+    moves = []
+    for index in record.moves:  # On the board and each on a free cell: GameRecord checks both
+        moves.append(analyze_move(game, index, level, budget or {}))
+        game.play(index)
+    return {
+        'type': 'game',
+        'source': source,
+        'game': number,
+        'size': record.size,
+        'players': record.players,
+        'win_condition': record.win_condition,
+        'winner': record.winner,
+        'moves': moves,
+        'missed_wins': sum(1 for move in moves if move and move['missed_win']),
+        'time': time.perf_counter() - started,
+    }
+
+
+def analyze_chunk(chunk, level, budget):
+    return [analyze_game(source, number, data, level, budget) for source, number, data in chunk]
+
+
+def analyze(games, level=1, budget=None, workers=1, chunk_size=8):
+    """Yield analysed games in input order; more than one worker spreads the chunks over a process pool."""
+    chunks = chunked(games, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from analyze_chunk(chunk, level, budget)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(analyze_chunk, chunk, level, budget))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gobang.batch', description="Analyse recorded games")
+    parser.add_argument('paths', nargs='+', help="record files, directories of them, or - for standard input")
+    parser.add_argument('--level', type=int, default=1, help="search level used for every move")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="seconds per move to find the engine's move, and again to score the move played")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--chunk', type=int, default=8, help="games per task handed to a worker")
+    parser.add_argument('--out', help="JSONL file (default: standard output)")
+    args = parser.parse_args(argv)
+
+    budget = {'time_limit': args.time_limit} if args.time_limit else {}
+    stream = open(args.out, 'w') if args.out else sys.stdout
+    started = time.perf_counter()
+    count = moves = 0
+    try:
+        for result in analyze(iter_games(args.paths), args.level, budget, args.workers or os.cpu_count(), args.chunk):
+            stream.write(json.dumps(result) + '\n')
+            count += 1
+            moves += len(result['moves'])
+            if count % 100 == 0:
+                print(f"{count} games, {count / (time.perf_counter() - started):.1f} games/s", file=sys.stderr)
+        elapsed = time.perf_counter() - started
+        stream.write(json.dumps({'type': 'summary', 'games': count, 'moves': moves, 'time': elapsed,
+                                 'games_per_second': count / elapsed if elapsed else 0.0}) + '\n')
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    print(f"{count} games, {moves} moves in {elapsed:.1f}s: {count / elapsed if elapsed else 0.0:.2f} games/s",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
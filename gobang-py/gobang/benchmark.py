@@ -0,0 +1,207 @@
+"""
+Benchmarks for the engine's hot paths.
+
+    python -m gobang.benchmark --json before.json
+    python -m gobang.benchmark --json after.json --compare before.json
+    python -m gobang.benchmark --players 2 --win 5 --bench get_ai_move
+
+Every benchmark runs on seeded random positions for each combination of
+stone count (0, 20, 60, 120), player count (1-4) and win condition (4, 5),
+so two runs measure the same positions.  Stones are placed so that nobody
+has won yet; when that is no longer possible the position stays smaller,
+and its real stone count is reported.
+
+Positions are built without the opening book, so get_ai_move searches
+rather than looks a move up (on an empty board the only candidate is the
+centre, so the 0-stone cases still time that shortcut).  Each case is timed
+in several samples; the suite reports the median operations per second,
+their spread ((max - min) / median) and the tracemalloc peak of one batch.
+The JSON file has sorted keys and one entry per benchmark/players/win/stones
+case, so runs can be diffed or compared with --compare.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from .game import Gobang
+
+BENCHMARKS = ['check_winner', 'check_line_win', 'evaluate_move', 'check_line_potential',
+              'pick_valid_move', 'pick_valid_move_best', 'get_ai_move']
+DENSITIES = [0, 20, 60, 120]
+
+
+def make_position(players, win_condition, stones, seed):
+    """A Gobang with up to `stones` random stones and no winner, the same for the same arguments."""
+    rng = random.Random(f"{players}/{win_condition}/{stones}/{seed}")
+    game = Gobang(players=players, win_condition=win_condition, table_mb=4, book=None)  # Time searches, not lookups
+    game.set_player_limits()
+    while game.moves_played < stones:
+        player = game.current_player
+        region = game.first_move_region(player)
+        cells = [index for index in range(game.size * game.size)
+                 if game.bits.is_empty(index) and index not in game.threats.wins[player]]
+        if region:
+            row_min, row_max, col_min, col_max = region
+            cells = [index for index in cells
+                     if row_min <= index // game.size < row_max and col_min <= index % game.size < col_max]
+        if not cells:
+            break  # Any further stone would win
+        game.play(rng.choice(cells))
+    return game
+
+
+def cases(game, seed):
+    """name -> (function running one batch, operations per batch, untimed setup before each batch or None)."""
+    size = game.size
+    cells = [(row, col) for row in range(size) for col in range(size)]
+    free = [(row, col) for row, col in cells if game.board[row][col] == '.']
+    symbol = game.symbols[game.current_player]
+
+    def check_winner():
+        for row, col in cells:
+            game.check_winner(row, col)
+
+    def check_line_win():
+        # The win-or-block scan at the start of get_ai_move
+        for player in range(game.players):
+            wins = game.threats.wins[player]
+            if wins:
+                divmod(min(wins), size)
+
+    def evaluate_move():
+        for row, col in free:
+            game.evaluate_move(row, col, symbol)
+
+    def check_line_potential():
+        for row, col in free:
+            game.check_line_potential(row, col, symbol)
+
+    def pick_valid_move():
+        game.pick_valid_move(free)
+
+    def pick_valid_move_best():
+        game.pick_valid_move()
+
+    def fresh_search():
+        game.engine.table.clear()  # Every call searches from scratch
+        game.mcts.random.seed(seed)
+
+    def get_ai_move():
+        game.get_ai_move(1)
+
+    return {
+        'check_winner': (check_winner, len(cells), None),
+        'check_line_win': (check_line_win, game.players, None),
+        'evaluate_move': (evaluate_move, len(free), None),
+        'check_line_potential': (check_line_potential, len(free), None),
+        'pick_valid_move': (pick_valid_move, 1, None),
+        'pick_valid_move_best': (pick_valid_move_best, 1, None),
+        'get_ai_move': (get_ai_move, 1, fresh_search),
+    }
+
+
+def measure(function, ops, setup, min_time, samples):
+    """(operations per second of each sample, tracemalloc peak bytes of one batch); min_time is per sample."""
+    setup = setup or (lambda: None)
+    setup()
+    function()  # Warm up
+    rates = []
+    for _ in range(samples):
+        batches = 0
+        elapsed = 0.0
+        while batches == 0 or elapsed < min_time:
+            setup()
+            started = time.perf_counter()
+            function()
+            elapsed += time.perf_counter() - started
+            batches += 1
+        rates.append(batches * ops / elapsed if elapsed else 0.0)
+    setup()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rates, peak
+
+
+def run(benchmarks=BENCHMARKS, players=(1, 2, 3, 4), wins=(4, 5), densities=DENSITIES, seed=1, min_time=0.2,
+        samples=5):
+    results = {}
+    for count in players:
+        for win_condition in wins:
+            for stones in densities:
+                game = make_position(count, win_condition, stones, seed)
+                batch = cases(game, seed)
+                for name in benchmarks:
+                    function, ops, setup = batch[name]
+                    rates, peak = measure(function, ops, setup, 0.0 if name == 'get_ai_move' else min_time / samples,
+                                          samples)
+                    rate = statistics.median(rates)
+                    spread = (max(rates) - min(rates)) / rate if rate else 0.0
+                    key = f"{name}/p{count}/w{win_condition}/s{stones}"
+                    results[key] = {
+                        'ops_per_second': round(rate, 1),  # Median of the samples
+                        'spread': round(spread, 3),
+                        'samples': samples,
+                        'peak_bytes': peak,
+                        'stones': game.moves_played,
+                    }
+                    print(f"{key:<42} {rate:>14,.0f} ops/s +/-{spread / 2:>6.1%} {peak / 1024:>9.1f} KiB",
+                          file=sys.stderr)
+    return results
+
+
+def compare(results, baseline):
+    """Print the speed ratio of every case found in both runs."""
+    print(f"{'case':<42} {'before':>12} {'after':>12} {'ratio':>7}")
+    for key in sorted(results):
+        if key in baseline:
+            before = baseline[key]['ops_per_second']
+            after = results[key]['ops_per_second']
+            ratio = after / before if before else float('inf')
+            print(f"{key:<42} {before:>12,.0f} {after:>12,.0f} {ratio:>6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gobang.benchmark', description="Engine benchmarks")
+    parser.add_argument('--bench', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--players', nargs='+', type=int, choices=(1, 2, 3, 4), default=[1, 2, 3, 4])
+    parser.add_argument('--win', nargs='+', type=int, choices=(4, 5), default=[4, 5])
+    parser.add_argument('--stones', nargs='+', type=int, default=DENSITIES, help="stones on the board")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="seconds per case, split over the samples (get_ai_move runs once per sample)")
+    parser.add_argument('--samples', type=int, default=5, help="timed samples per case, reported as their median")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.bench, args.players, args.win, args.stones, args.seed, args.min_time, args.samples)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'min_time': args.min_time,
+            'samples': args.samples,
+        },
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=1, sort_keys=True)
+            file.write('\n')
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Bitboard backend for the Gobang engine.
+
+Each player owns one integer mask with one bit per cell.  The bits are laid out
+row by row on a grid that is one column wider than the board and has a guard
+row above and below it, so shifting a mask by one of the four direction steps
+can never wrap a line from one edge of the board to the other.
+"""
+
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, Horizontal, Diagonal-right, Diagonal-left
+EMPTY = -1  # Value of a free cell in BitBoard.cells
+
+_layouts = {}  # (size, win_condition) -> read-only cell tables, shared by every board of that shape
+
+
+class BitBoard:
+    def __init__(self, size=15, players=1, win_condition=5):
+        self.size = size
+        self.players = players
+        self.win_condition = win_condition
+        self.stride = size + 1  # One guard column between consecutive rows
+        self.steps = [dr * self.stride + dc for dr, dc in DIRECTIONS]  # Bit distance of one step per direction
+        self.masks = [0] * players  # One stone mask per player
+        self.occupied = 0  # Union of all player masks
+        self.cells = [EMPTY] * (size * size)  # Owner of each cell, for plain lookups
+        layout = _layouts.get((size, win_condition))
+        if layout is None:
+            self.pos = [(r + 1) * self.stride + c + 1 for r in range(size) for c in range(size)]  # Cell index -> bit position
+            self.bit = [1 << p for p in self.pos]
+            self.line_masks = [self._ray_masks(i, -(win_condition - 1), win_condition - 1) for i in range(size * size)]
+            layout = _layouts[size, win_condition] = (self.pos, self.bit, self.line_masks)
+        self.pos, self.bit, self.line_masks = layout
+
+    def _ray_masks(self, index, first, last):
+        """Masks of the cells `first`..`last` steps away from index, one per direction."""
+        row, col = divmod(index, self.size)
+        masks = []
+        for dr, dc in DIRECTIONS:
+            mask = 0
+            for step in range(first, last + 1):
+                r, c = row + dr * step, col + dc * step
+                if 0 <= r < self.size and 0 <= c < self.size:
+                    mask |= self.bit[r * self.size + c]
+            masks.append(mask)
+        return masks
+
+    def place(self, player, index):
+        self.masks[player] |= self.bit[index]
+        self.occupied |= self.bit[index]
+        self.cells[index] = player
+
+    def remove(self, player, index):
+        self.masks[player] &= ~self.bit[index]
+        self.occupied &= ~self.bit[index]
+        self.cells[index] = EMPTY
+
+    def is_empty(self, index):
+        return not self.occupied & self.bit[index]
+
+    def empty_cells(self):
+        return [i for i, owner in enumerate(self.cells) if owner == EMPTY]
+
+    def count(self, player, mask):
+        """Number of the player's stones inside mask."""
+        return (self.masks[player] & mask).bit_count()
+
+    def wins_at(self, player, index):
+        """True if a stone of player on index is part of win_condition in a row."""
+        stones = self.masks[player] | self.bit[index]
+        for step, line_mask in zip(self.steps, self.line_masks[index]):
+            line = stones & line_mask
+            for _ in range(self.win_condition - 1):
+                line &= line >> step
+            if line:
+                return True
+        return False
+
+    def run_lengths(self, player, index, direction, limit):
+        """Consecutive stones of player next to index, forward and backward, at most limit each way."""
+        stones = self.masks[player]
+        pos = self.pos[index]
+        step = self.steps[direction]
+        forward = 0
+        while forward < limit and stones >> (pos + step * (forward + 1)) & 1:
+            forward += 1
+        backward = 0
+        while backward < limit and stones >> (pos - step * (backward + 1)) & 1:
+            backward += 1
+        return forward, backward
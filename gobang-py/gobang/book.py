@@ -0,0 +1,169 @@
+"""
+Opening book for the first plies of a game.
+
+With three or four players every first move is confined to a fixed region
+(set_player_limits), so games open in the same few ways.  The book stores
+the AI's reply for every position reachable in the first few plies when
+each player picks among their best few candidates.  The replies are worked
+out offline with a long search:
+
+    python -m gobang.book --players 3 4 --win 4 5 --plies 4 --out gobang/openings.book
+
+File layout, little-endian:
+
+    header   magic b'GBOB', version (H), plies covered (H), record count (I)
+    records  position key (Q), cell index (H), sorted by key
+
+A position key is the game's Zobrist key XOR a hash of the rules (size,
+players, win_condition and the limits table).  Books for several rule sets
+can therefore share one file, and a different limits table never matches.
+OpeningBook maps the file on the first lookup and binary-searches it, so
+creating a game costs nothing and a lookup reads a few pages.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b'GBOB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+RECORD = struct.Struct('<QH')
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openings.book')
+
+
+def rules_key(game):
+    """64-bit hash of the rules a book entry is valid for."""
+    import hashlib  # Costs more than the rest of the package to import; only needed for a lookup
+
+    limits = sorted(game.player_limits.items())
+    text = repr((game.size, game.players, game.win_condition, limits)).encode()
+    return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), 'little')
+
+
+def position_key(game):
+    return game.key ^ rules_key(game)
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK):
+        self.path = path
+        self._map = None  # Opened on the first lookup; False if there is no usable file
+        self.plies = 0
+        self.count = 0
+
+    def _open(self):
+        self._map = False
+        try:
+            with open(self.path, 'rb') as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # Missing or empty file
+            return
+        magic, version, plies, count = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION or len(mapped) < HEADER.size + count * RECORD.size:
+            mapped.close()
+            return
+        self._map, self.plies, self.count = mapped, plies, count
+
+    def close(self):
+        if self._map:
+            self._map.close()
+        self._map = None
+
+    def lookup(self, game):
+        """Cell index the book plays in this position, or None."""
+        if self._map is None:
+            self._open()
+        if not self._map or game.moves_played >= self.plies:
+            return None
+        key = position_key(game)
+        mapped = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found, move = RECORD.unpack_from(mapped, HEADER.size + middle * RECORD.size)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                row, col = divmod(move, game.size)
+                region = game.first_move_region(game.current_player)
+                if game.bits.is_empty(move) and (not region or game.is_move_allowed(game.current_player, row, col)):
+                    return move
+                return None  # Hash collision: not a legal move here
+        return None
+
+
+def write_book(path, entries, plies):
+    """Write {position key: cell index} as a book file covering the first `plies` plies."""
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, plies, len(entries)))
+        for key in sorted(entries):
+            file.write(RECORD.pack(key, entries[key]))
+
+
+def build(players, win_condition, plies, width, level, budget, entries, seed=1):
+    """Add the book moves for one rule set to entries; returns the number of positions searched."""
+    from .game import Gobang
+
+    game = Gobang(players=players, win_condition=win_condition, book=None)
+    game.set_player_limits()
+    searched = 0
+
+    def visit(depth):
+        nonlocal searched
+        key = position_key(game)
+        if depth >= plies or key in entries:
+            return
+        game.engine.table.clear()
+        game.mcts.random.seed(seed)
+        move = game.get_ai_move(level, **budget)
+        if move is None:
+            return
+        best = move[0] * game.size + move[1]
+        entries[key] = best
+        searched += 1
+        print(f"players={players} win={win_condition} ply={depth} {len(entries)} positions", file=sys.stderr)
+        # Follow the book move and the other strong candidates a player might choose
+        symbol = game.symbols[game.current_player]
+        region = game.first_move_region(game.current_player)
+        scored = sorted((-game.evaluate_move(i // game.size, i % game.size, symbol), i)
+                        for i in game.candidates.moves(region))
+        replies = [best] + [i for _, i in scored if i != best][:width - 1]
+        for index in replies:
+            game.play(index)
+            won = game.check_winner(index // game.size, index % game.size)
+            if not won:
+                visit(depth + 1)
+            game.undo()
+
+    visit(0)
+    return searched
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m gobang.book', description="Build the opening book")
+    parser.add_argument('--players', nargs='+', type=int, choices=(2, 3, 4), default=[3, 4])
+    parser.add_argument('--win', nargs='+', type=int, choices=(4, 5), default=[4, 5])
+    parser.add_argument('--plies', type=int, default=4, help="how many plies from the start the book covers")
+    parser.add_argument('--width', type=int, default=3, help="replies followed per position")
+    parser.add_argument('--level', type=int, default=3, help="AI level used for the book moves")
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds per book move")
+    parser.add_argument('--out', default=DEFAULT_BOOK)
+    args = parser.parse_args(argv)
+
+    budget = {'time_limit': args.time_limit} if args.time_limit else {}
+    entries = {}
+    for players in args.players:
+        for win_condition in args.win:
+            build(players, win_condition, args.plies, args.width, args.level, budget, entries)
+    write_book(args.out, entries, args.plies)
+    print(f"{len(entries)} positions, {os.path.getsize(args.out)} bytes -> {args.out}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Candidate-move generator.
+
+Only free cells within `radius` rows and columns of a stone are worth
+scoring.  CandidateSet counts, for every cell, the stones in that square
+around it and keeps the free cells with a non-zero count in a set, so each
+move touches (2 * radius + 1) ** 2 counters instead of the AI rescanning the
+whole board.
+"""
+
+from .bitboard import EMPTY
+
+_neighbours = {}  # (size, radius) -> near table, shared by every set of that shape
+
+
+class CandidateSet:
+    def __init__(self, bits, radius=2):
+        self.bits = bits
+        self.radius = radius
+        size = bits.size
+        if (size, radius) not in _neighbours:
+            near = []
+            for index in range(size * size):
+                row, col = divmod(index, size)
+                near.append(tuple(
+                    r * size + c
+                    for r in range(max(0, row - radius), min(size, row + radius + 1))
+                    for c in range(max(0, col - radius), min(size, col + radius + 1))
+                    if (r, c) != (row, col)
+                ))
+            _neighbours[size, radius] = near
+        self.near = _neighbours[size, radius]  # Cells within radius of each cell, the cell itself excluded
+        self.counts = [0] * (size * size)  # Stones within radius of each cell
+        self.cells = set()  # Free cells with at least one stone within radius
+
+    def update(self, index):
+        """Refresh the set after a stone was placed on or removed from index."""
+        cells = self.bits.cells
+        counts = self.counts
+        if cells[index] != EMPTY:
+            self.cells.discard(index)
+            for cell in self.near[index]:
+                counts[cell] += 1
+                if counts[cell] == 1 and cells[cell] == EMPTY:
+                    self.cells.add(cell)
+        else:
+            for cell in self.near[index]:
+                counts[cell] -= 1
+                if not counts[cell]:
+                    self.cells.discard(cell)
+            if counts[index]:
+                self.cells.add(index)
+
+    def moves(self, region=None):
+        """
+        Candidate cells in row-major order.  region is a first-move limit
+        (row_min, row_max, col_min, col_max) the move has to respect.
+        """
+        size = self.bits.size
+        if region is None:
+            if self.cells:
+                return sorted(self.cells)
+            if self.bits.occupied:
+                return self.bits.empty_cells()  # Radius 0: nothing is "near", consider everything
+            return [(size // 2) * size + size // 2]  # Empty board: take the centre
+        row_min, row_max, col_min, col_max = region
+        allowed = [index for index in sorted(self.cells)
+                   if row_min <= index // size < row_max and col_min <= index % size < col_max]
+        if allowed:
+            return allowed
+        # Nothing in play reaches the region yet: use its free cells closest to the centre
+        free = [r * size + c for r in range(row_min, row_max) for c in range(col_min, col_max)
+                if self.bits.cells[r * size + c] == EMPTY]
+        if not free:
+            return []
+        centre = size // 2
+
+        def distance(index):
+            return max(abs(index // size - centre), abs(index % size - centre))
+
+        nearest = min(map(distance, free))
+        return [index for index in free if distance(index) == nearest]
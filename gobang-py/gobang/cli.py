@@ -0,0 +1,128 @@
+"""
+Console front end: the game played by typing moves like D5.
+"""
+
+import argparse
+
+from .game import Gobang
+
+
+class ConsoleGame(Gobang):
+    def display_board(self):
+        print("   " + " ".join(self.column_labels))  # Column labels A-O
+        for i, row in enumerate(self.board, start=1):
+            print(str(i).rjust(2) + " " + " ".join(row))  # Row numbers from 1 to 15
+
+    def make_move(self, row, col):
+        row -= 1  # Convert to 0-based index
+        col = ord(col.upper()) - ord('A')  # Convert letter to index
+        
+        if not (0 <= row < self.size and 0 <= col < self.size) or self.board[row][col] != '.':
+            return False
+        
+        symbol = self.symbols[self.current_player]
+        self.play(row * self.size + col)  # Place player's symbol and switch to next player
+        self.display_board()
+        
+        if self.check_winner(row, col):
+            print(f"Player {symbol} wins!")
+            exit()
+        
+        if self.moves_played == self.size * self.size:
+            print("It's a draw!")
+            exit()
+        
+        return True
+
+    def setup(self):
+        # Ask for the players, AI levels and win condition, then start a fresh board
+        print("Welcome to Multiplayer Gobang (1-4 players)")
+        while True:
+            try:
+                self.players = int(input("Enter number of players (1-4): "))
+                if 1 <= self.players <= 4:
+                    self.symbols = ['X', 'O', '#', '@'][:self.players]
+                    break
+                else:
+                    print("Invalid input! Please enter 1, 2, 3, or 4.")
+            except ValueError:
+                print("Invalid input! Please enter a number.")
+        
+        for i in range(self.players):
+            while True:
+                ai_choice = input(f"Is player {self.symbols[i]} an AI? (yes/no): ").strip().lower()
+                if ai_choice in ['yes', 'no']:
+                    self.is_ai.append(ai_choice == 'yes')
+                    if ai_choice == 'yes':
+                        while True:
+                            try:
+                                level = int(input(f"Choose AI difficulty for {self.symbols[i]} (1=Easy, 2=Medium, 3=Hard): "))
+                                if 1 <= level <= 3:
+                                    self.ai_levels.append(level)
+                                    break
+                                else:
+                                    print("Invalid input! Choose 1, 2, or 3.")
+                            except ValueError:
+                                print("Invalid input! Please enter a number.")
+                    else:
+                        self.ai_levels.append(None)
+                    break
+                else:
+                    print("Invalid input! Please enter 'yes' or 'no'.")
+        
+        self.set_player_limits()  # Set player-specific move limits
+        
+        while True:
+            try:
+                self.win_condition = int(input("Choose victory condition (4-in-a-row or 5-in-a-row): "))
+                if self.win_condition in [4, 5]:
+                    break
+                else:
+                    print("Invalid input! Choose 4 or 5.")
+            except ValueError:
+                print("Invalid input! Please enter a number.")
+        
+        self.reset_board()  # Rebuild the board for the chosen players and win condition
+
+    def start_game(self):
+        self.setup()
+        self.display_board()
+        while True:
+            print(f"Player {self.symbols[self.current_player]}'s turn")
+            if self.is_ai[self.current_player]:
+                row, col = self.get_ai_move(self.ai_levels[self.current_player])
+                row += 1  # Convert back to 1-based index
+                col = self.column_labels[col]  # Convert index to letter
+                print(f"AI chooses: {col}{row}")
+            else:
+                move = input("Enter your move (e.g., D5, or UNDO to take back): ").strip().upper()
+                if move == 'UNDO':
+                    if self.take_back():
+                        self.display_board()
+                    else:
+                        print("Nothing to take back!")
+                    continue
+                try:
+                    col, row = move[0], int(move[1:])
+                except (ValueError, IndexError):
+                    print("Invalid input! Use letter + number format (e.g., D5).")
+                    continue
+            
+            if self.make_move(row, col):
+                continue
+            else:
+                print("Invalid move! Try again.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='gobang', description="Multiplayer Gobang (1-4 players)")
+    parser.add_argument('--tk', action='store_true', help="play in a tkinter window instead of the console")
+    parser.add_argument('--cache', help="SQLite file the AI keeps its analysis in between games")
+    args = parser.parse_args(argv)
+    game = ConsoleGame(players=3, cache=args.cache)  # The real number of players is asked for in setup()
+    if args.tk:
+        from .gui import TkGame  # tkinter is only imported for the window
+        game.setup()
+        TkGame(game).run()
+    else:
+        game.start_game()
@@ -0,0 +1,286 @@
+import time
+
+from .bitboard import BitBoard
+from .candidates import CandidateSet
+from .mcts import MCTS_LEVELS, MonteCarloEngine
+from .patterns import PatternEvaluator
+from .runs import RunTable
+from .scorecache import ScoreCache
+from .search import LEVELS, WIN_SCORE, SearchEngine
+from .threats import ThreatIndex
+from .vcf import ThreatSolver
+from .zobrist import Zobrist
+
+
+class Gobang:
+    """
+    The game rules, board state and AI, without any input or output.  The
+    console and tkinter front ends (cli.py, gui.py) and the web server build
+    on this class.
+    """
+
+    def __init__(self, size=15, players=1, win_condition=5, candidate_radius=2, table_mb=16, backend='python',
+                 book=True, cache=None):
+        self.size = size  # Board size (15x15 by default)
+        self.players = players  # Ensure at least one player
+        self.symbols = ['X', 'O', '#', '@'][:self.players]  # Unique symbols for each player
+        self.current_player = 0  # Index of the current player
+        self.moves_played = 0  # Count of moves played
+        self.is_ai = []  # AI status for each player
+        self.ai_levels = []  # AI difficulty levels
+        self.win_condition = win_condition  # 4-in-a-row or 5-in-a-row
+        self.column_labels = [chr(i) for i in range(ord('A'), ord('A') + self.size)]  # A-O columns
+        self.player_limits = {}  # To track player-specific move limits
+        self.first_move = [True] * self.players  # Track if it's the player's first move
+        self.candidate_radius = candidate_radius  # AI only considers cells this close to a stone
+        self.table_mb = table_mb  # Memory for the AI's transposition table
+        self.backend = backend  # 'numpy' scores whole boards with array operations (see vectorized.py)
+        self.parallel = None  # Worker processes for get_ai_move(workers=...), started on first use
+        self.ai_info = {}  # Set by get_ai_move
+        self.book = None  # Precomputed opening replies: True for the shipped book, or a file name
+        if book:
+            from .book import DEFAULT_BOOK, OpeningBook  # Imported here so `python -m gobang.book` runs cleanly
+            self.book = OpeningBook(DEFAULT_BOOK if book is True else book)
+        self.cache = None  # SQLite file of earlier search results, kept across runs (see analysis.py)
+        if cache:
+            from .analysis import AnalysisCache
+            self.cache = AnalysisCache(cache)
+        self.reset_board()
+
+    def reset_board(self):
+        # Called again by the front ends once the number of players and the win condition are known
+        self.board = [['.' for _ in range(self.size)] for _ in range(self.size)]  # Empty board
+        self.bits = BitBoard(self.size, self.players, self.win_condition)  # Bitboard mirror of self.board
+        self.runs = RunTable(self.bits)  # Run lengths next to every cell, updated on each move
+        self.threats = ThreatIndex(self.bits, self.runs)  # Winning and four-making cells per player
+        self.candidates = CandidateSet(self.bits, self.candidate_radius)  # Free cells near the stones in play
+        self.patterns = PatternEvaluator(self.bits)  # Shape lookup tables for evaluate_move
+        self.score_cache = ScoreCache(self.patterns)  # evaluate_move of every free cell, kept current by play/undo
+        self.vector = None  # NumPy mirror of self.board, only with backend='numpy'
+        if self.backend == 'numpy':
+            from .vectorized import VectorBoard  # Imported here so NumPy is only loaded when asked for
+            self.vector = VectorBoard(self)
+        self.history = []  # Cell index of every stone, oldest first
+        self.last_move = None  # Cell index of the newest stone
+        self.zobrist = Zobrist(self.size)
+        self.key = self.zobrist.turn[0]  # Zobrist key of the position, kept up to date by play/undo
+        self.engine = SearchEngine(self, self.table_mb)  # Reused for every AI move of this game
+        self.mcts = MonteCarloEngine(self)  # Max-n tree search for three or four players
+        self.solver = ThreatSolver(self)  # Forced-win search tried before the full search
+        if self.parallel is not None:
+            self.parallel.close()  # The workers were set up for the old rules
+            self.parallel = None
+        self.current_player = 0
+        self.moves_played = 0
+        self.first_move = [True] * self.players
+
+    def check_winner(self, row, col):
+        symbol = self.board[row][col]
+        if symbol not in self.symbols:
+            return False
+        if self.vector is not None:
+            return self.vector.check_winner(row, col)
+        player = self.symbols.index(symbol)
+        index = row * self.size + col
+        if index == self.last_move or self.bits.is_empty(index):
+            return self.runs.completes(player, index)  # Run lengths around a free cell or the newest stone are current
+        return self.bits.wins_at(player, index)
+    
+    def get_ai_move(self, level, workers=1, engine=None, **budget):
+        # workers > 1 spreads the search over that many processes (see parallel.py).
+        # engine picks 'alphabeta' or 'mcts' instead of the default for the player count;
+        # budget overrides the level's search settings (see LEVELS and MCTS_LEVELS).
+        # The level's time_limit covers the whole move: book, cache and solver time come off the search.
+        started = time.perf_counter()
+        def check_line_win(symbol):
+            wins = self.threats.wins[self.symbols.index(symbol)]
+            return divmod(min(wins), self.size) if wins else None
+
+        # Play from the opening book while the game is still in it
+        self.ai_info = {'stage': 'book', 'nodes': 0}  # How the last AI move was found and the nodes it took
+        if self.book is not None:
+            move = self.book.lookup(self)
+            if move is not None:
+                return divmod(move, self.size)
+        
+        # Try to win
+        self.ai_info['stage'] = 'win'
+        win_move = check_line_win(self.symbols[self.current_player])
+        if win_move:
+            return win_move
+        
+        # Try to block opponent from winning
+        self.ai_info['stage'] = 'block'
+        for i in range(self.players):
+            if i != self.current_player:
+                block_move = check_line_win(self.symbols[i])
+                if block_move:
+                    return block_move
+        
+        # Alpha-beta needs one opponent, so bigger games use the Monte Carlo engine
+        if engine is None:
+            engine = 'mcts' if self.players > 2 else 'alphabeta'
+
+        # Reuse an earlier analysis of this position if it is a proven win or was searched deep enough
+        if self.cache is not None:
+            self.ai_info['stage'] = 'cache'
+            entry = self.cache.lookup(self)
+            depth = dict(LEVELS.get(level, LEVELS[max(LEVELS)]), **budget)['max_depth']
+            if entry is not None and (entry['proven'] or engine == 'alphabeta' and entry['depth'] >= depth):
+                return divmod(entry['move'], self.size)
+
+        levels = MCTS_LEVELS if engine == 'mcts' else LEVELS
+        time_limit = budget.get('time_limit', levels.get(level, levels[max(levels)])['time_limit'])
+
+        # Look for a forced win by continuous fours or threes
+        forced = self.solver.solve(time_limit=time_limit - (time.perf_counter() - started))
+        self.ai_info = {'stage': 'solver', 'nodes': self.solver.nodes}
+        if forced is not None:
+            if self.cache is not None:
+                self.cache.store(self, forced, WIN_SCORE, 0, proven=True)
+            return divmod(forced, self.size)
+        
+        # Otherwise, search for the best move within what is left of the level's time and node budget
+        self.ai_info['stage'] = engine
+        budget = dict(budget, time_limit=max(0.0, time_limit - (time.perf_counter() - started)))
+        if workers > 1:
+            if self.parallel is None or self.parallel.workers != workers:
+                if self.parallel is not None:
+                    self.parallel.close()
+                from .parallel import ParallelSearch  # Pulls in multiprocessing, so only when used
+                self.parallel = ParallelSearch(self, workers)  # Started once, reused for every later move
+            if engine == 'mcts':
+                move = self.parallel.search_mcts(level, **budget)
+            else:
+                move = self.parallel.search(level, **budget)
+            info = self.parallel.info
+        else:
+            searcher = self.mcts if engine == 'mcts' else self.engine
+            move = searcher.search(level, **budget)
+            info = searcher.info
+        self.ai_info['nodes'] += info.get('nodes', info.get('iterations', 0))
+        if self.cache is not None and move is not None and info.get('depth'):
+            self.cache.store(self, move, info['score'], info['depth'])  # Monte Carlo results have no depth and are not kept
+        return divmod(move, self.size) if move is not None else None
+
+    def evaluate_move(self, row, col, player_symbol):
+        """
+        评估该位置的优先级，评分规则如下：
+        1. 查表得到自己在四个方向上能形成的棋型（五连、活四、冲四、活三、眠三、活二……）及组合（双四、四三、双三）的分数。
+        2. 加上对手在该位置能形成的最高棋型分，堵住对方的好点。
+        3. 靠近中心少量加分，用于空棋盘时打破平局。
+        """
+        # 分数在每次落子后由 score_cache 增量更新（见 scorecache.py），这里直接查表
+        if self.vector is not None:
+            return int(self.vector.values()[self.symbols.index(player_symbol), row, col])
+        return self.score_cache.value[self.symbols.index(player_symbol)][row * self.size + col]
+
+    def check_line_potential(self, row, col, player_symbol):
+        """
+        检查是否能在指定位置形成2-in-a-row或3-in-a-row的潜力。
+        """
+        player = self.symbols.index(player_symbol)
+        index = row * self.size + col
+        potential_score = 0
+        for direction in range(4):
+            # 对每个方向检查潜力
+            forward, backward = self.bits.run_lengths(player, index, direction, self.win_condition - 1)
+            potential_score += forward + backward
+        return potential_score
+
+    def pick_valid_move(self, empty_cells=None):
+        """
+        从可用的空位置中选择最佳位置。不给出 empty_cells 时直接从 score_cache 的堆里取最高分的空位。
+        """
+        if empty_cells is None:
+            cache = self.vector if self.vector is not None else self.score_cache
+            index = cache.best(self.current_player)
+            return divmod(index, self.size) if index is not None else None
+        if self.vector is not None:
+            return self.vector.pick(self.current_player, list(empty_cells))  # 一次性算出整盘分数
+
+        best_move = None
+        best_score = -float('inf')  # 初始化为极小的值
+
+        # 评估每个空位置的分数
+        for row, col in empty_cells:
+            score = self.evaluate_move(row, col, self.symbols[self.current_player])
+            if score > best_score:
+                best_score = score
+                best_move = (row, col)
+
+        return best_move
+
+    def is_move_allowed(self, player, row, col):
+        limit = self.player_limits.get(player, None)
+        if limit:
+            row_min, row_max, col_min, col_max = limit
+            return row_min <= row < row_max and col_min <= col < col_max
+        return True  # No limitation, player can move anywhere
+
+    def first_move_region(self, player):
+        # The area a player's first move is confined to, or None once it no longer applies
+        return self.player_limits.get(player) if self.first_move[player] else None
+
+    def set_player_limits(self):
+        if self.players == 3:
+            self.player_limits[0] = (8, 15, 8, 15)  # Player 1's restricted area
+            self.player_limits[1] = (5, 15, 5, 15)  # Player 2's restricted area
+            self.player_limits[2] = (0, 15, 0, 15)  # Player 3 has no restriction
+        elif self.players == 4:
+            self.player_limits[0] = (8, 15, 8, 15)  # Player 1's restricted area
+            self.player_limits[1] = (6, 15, 6, 15)  # Player 2's restricted area
+            self.player_limits[2] = (4, 15, 4, 15)  # Player 3's restricted area
+            self.player_limits[3] = (0, 15, 0, 15)  # Player 4 has no restriction
+
+    def play(self, index):
+        """
+        Place the current player's stone on the free cell index and pass the turn; undo() takes it back.
+        Shared by make_move and the search, so it never prints, validates or ends the game.
+        """
+        player = self.current_player
+        self.board[index // self.size][index % self.size] = self.symbols[player]
+        self.bits.place(player, index)
+        self.runs.place(player, index)
+        self.threats.update(index)
+        self.candidates.update(index)
+        self.score_cache.place(player, index)
+        if self.vector is not None:
+            self.vector.place(player, index)
+        self.history.append(index)
+        self.first_move[player] = False  # After the first move, no more restrictions
+        self.last_move = index
+        self.moves_played += 1
+        self.current_player = (player + 1) % self.players
+        self.key ^= self.zobrist.cells[player][index] ^ self.zobrist.turn[player] ^ self.zobrist.turn[self.current_player]
+
+    def undo(self):
+        """
+        Take back the newest stone and return its cell index.  Every cache is
+        restored from the stone itself, so no copy of the position is kept.
+        """
+        index = self.history.pop()
+        player = self.bits.cells[index]
+        self.board[index // self.size][index % self.size] = '.'
+        self.bits.remove(player, index)
+        self.runs.remove(player, index)
+        self.threats.update(index)
+        self.candidates.update(index)
+        self.score_cache.remove(player, index)
+        if self.vector is not None:
+            self.vector.remove(index)
+        self.first_move[player] = not self.bits.masks[player]  # No stones left means the first move is still to come
+        self.last_move = self.history[-1] if self.history else None
+        self.moves_played -= 1
+        self.key ^= self.zobrist.cells[player][index] ^ self.zobrist.turn[player] ^ self.zobrist.turn[self.current_player]
+        self.current_player = player
+        return index
+
+    def take_back(self):
+        """悔棋：撤销上一步，以及其后电脑玩家的所有落子，直到轮到人类玩家。"""
+        if not self.history:
+            return False
+        self.undo()
+        while self.history and self.is_ai and self.is_ai[self.current_player]:
+            self.undo()
+        return True
@@ -0,0 +1,105 @@
+"""
+tkinter front end: click a grid cell to move, Undo or Ctrl+Z to take back.
+
+tkinter is imported when a window is made, so importing this module (or the
+gobang package) never needs a display.
+"""
+
+CELL = 40  # Pixels per grid cell
+
+
+class TkGame:
+    def __init__(self, game):
+        import tkinter as tk
+
+        self.game = game  # A Gobang set up with its players, AI levels and win condition
+        self.game_over = False
+        self.root = tk.Tk()
+        self.root.title("Gobang Game")
+        self.message_label = tk.Label(self.root, text="", font=("Helvetica", 14))
+        self.message_label.pack()
+        self.canvas = tk.Canvas(self.root, width=game.size * CELL, height=game.size * CELL)
+        self.canvas.pack()
+        self.canvas.bind("<Button-1>", self.click_event)
+        self.undo_button = tk.Button(self.root, text="Undo", command=self.take_back)
+        self.undo_button.pack()
+        self.root.bind("<Control-z>", self.take_back)
+        self.update_board()
+        self.update_message(f"Player {game.symbols[game.current_player]}'s turn")
+
+    def update_message(self, message):
+        self.message_label.config(text=message)
+
+    def draw_board(self):
+        board = self.game.board
+        for i in range(self.game.size):
+            for j in range(self.game.size):
+                x0 = i * CELL
+                y0 = j * CELL
+                x1 = x0 + CELL
+                y1 = y0 + CELL
+                self.canvas.create_rectangle(x0, y0, x1, y1, outline="black")
+                if board[j][i] != '.':
+                    self.canvas.create_text((x0 + x1) // 2, (y0 + y1) // 2, text=board[j][i], font=("Helvetica", 20))
+
+    def update_board(self):
+        self.canvas.delete("all")
+        self.draw_board()
+
+    def make_move(self, row, col):
+        """Play row, col (0-based) for the player to move; False if the move is not allowed."""
+        game = self.game
+        if self.game_over:
+            return False
+        if not (0 <= row < game.size and 0 <= col < game.size) or game.board[row][col] != '.':
+            self.update_message("Invalid move! Try again.")
+            return False
+        player = game.current_player
+        if game.first_move_region(player) and not game.is_move_allowed(player, row, col):
+            row_min, row_max, col_min, col_max = game.player_limits[player]
+            self.update_message(
+                f"Player {game.symbols[player]}'s first move must be in rows {row_min + 1}-{row_max}, "
+                f"columns {game.column_labels[col_min]}-{game.column_labels[col_max - 1]}"
+            )
+            return False
+
+        game.play(row * game.size + col)
+        self.update_board()
+        if game.check_winner(row, col):
+            self.update_message(f"Player {game.symbols[player]} wins!")
+            self.game_over = True
+        elif game.moves_played == game.size * game.size:
+            self.update_message("It's a draw!")
+            self.game_over = True
+        else:
+            self.update_message(f"Player {game.symbols[game.current_player]}'s turn")
+        return True
+
+    def take_back(self, event=None):
+        # 悔棋：撤销上一步，以及其后电脑玩家的落子，直到轮到人类玩家
+        if not self.game.take_back():
+            self.update_message("Nothing to take back!")
+            return
+        self.game_over = False
+        self.update_board()
+        self.update_message(f"Player {self.game.symbols[self.game.current_player]}'s turn")
+
+    def click_event(self, event):
+        col = event.x // CELL
+        row = event.y // CELL
+        click_x = event.x % CELL
+        click_y = event.y % CELL
+        if 10 <= click_x <= 30 and 10 <= click_y <= 30:  # Ensure the click is within the vicinity of the grid point
+            self.make_move(row, col)
+
+    def check_ai_move(self):
+        game = self.game
+        if not self.game_over and game.is_ai and game.is_ai[game.current_player]:
+            move = game.get_ai_move(game.ai_levels[game.current_player])
+            if move:
+                self.make_move(*move)
+        self.root.after(100, self.check_ai_move)
+
+    def run(self):
+        self.root.after(100, self.check_ai_move)
+        self.root.mainloop()
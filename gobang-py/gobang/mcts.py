@@ -0,0 +1,250 @@
+"""
+Monte Carlo tree search for games with three or four players.
+
+Minimax needs a single opponent; MonteCarloEngine instead keeps a reward
+vector per node, one entry per player (max-n UCT).  At every node the player
+to move picks the child that is best for themselves, so coalitions are never
+assumed.  Each iteration walks the tree, adds one child and finishes the game
+with a random playout.  The winner scores 1; a drawn or cut-off playout
+splits the point evenly.
+
+Playouts run on a plain list laid out like BitBoard's padded grid, so a
+move is one store and a win check is a few list lookups per direction.  Moves
+are drawn at random from the free cells next to a stone.  A player who has
+not moved yet picks inside their first-move region, the same rule
+set_player_limits imposes on people.  The root's children are the game's
+best candidates by evaluate_move; deeper nodes try every neighbouring cell.
+"""
+
+import math
+import random
+import time
+
+from .bitboard import EMPTY
+
+WALL = -2  # Guard cells around the board in the playout grid
+EXPLORATION = 1.0  # UCT exploration constant; rewards are in [0, 1]
+
+# AI difficulty -> playout budget.  width is how many root candidates are searched.
+MCTS_LEVELS = {
+    1: {'iterations': 1500, 'time_limit': 0.5, 'width': 8, 'playout_limit': 40},
+    2: {'iterations': 8000, 'time_limit': 1.5, 'width': 10, 'playout_limit': 50},
+    3: {'iterations': 40000, 'time_limit': 4.0, 'width': 12, 'playout_limit': 60},
+}
+
+
+class Node:
+    def __init__(self, move, player, moves, players):
+        self.move = move  # Padded grid position of the stone that led here, -1 at the root
+        self.player = player  # Who played it
+        self.moves = moves  # Free cells next to a stone after the move, the playout pool
+        self.untried = None  # Moves not expanded yet, filled on the first visit
+        self.children = []
+        self.visits = 0
+        self.rewards = [0.0] * players  # Sum of each player's playout rewards through this node
+        self.winner = None  # player if the move completed a line
+
+
+class MonteCarloEngine:
+    def __init__(self, game, seed=None):
+        self.game = game
+        self.random = random.Random(seed)
+        self.info = {}  # Statistics of the last search
+        bits = game.bits
+        size = game.size
+        self.stride = bits.stride
+        self.pos = bits.pos
+        self.index = {p: i for i, p in enumerate(bits.pos)}  # Padded position -> cell index
+        self.steps = bits.steps
+        self.neighbours = [d * s for s in bits.steps for d in (1, -1)]
+        self.grid_size = (size + 2) * self.stride + 1
+
+    def search(self, level=1, **budget):
+        """Most visited cell index for the player to move, or None if there is nowhere to play."""
+        settings = dict(MCTS_LEVELS.get(level, MCTS_LEVELS[max(MCTS_LEVELS)]))
+        settings.update(budget)
+        game = self.game
+        players = game.players
+        started = time.perf_counter()
+        deadline = started + settings['time_limit']
+        self.playout_limit = settings['playout_limit']
+        self.info = {}
+
+        self.regions = [self._region_cells(game.player_limits.get(player)) for player in range(players)]
+        grid = [WALL] * self.grid_size
+        for index, owner in enumerate(game.bits.cells):
+            grid[self.pos[index]] = owner
+        first = list(game.first_move)
+        mover = game.current_player
+
+        root = Node(-1, -1, self._pool(grid), players)
+        region = game.first_move_region(mover)
+        symbol = game.symbols[mover]
+        scored = sorted((-game.evaluate_move(i // game.size, i % game.size, symbol), i)
+                        for i in game.candidates.moves(region))
+        root.untried = [self.pos[i] for _, i in scored[:settings['width']]][::-1]  # Popped best first
+        if not root.untried:
+            return None
+        if len(root.untried) == 1:
+            return self.index[root.untried[0]]
+
+        iterations = 0
+        while iterations < settings['iterations']:
+            self._iterate(root, grid[:], first[:], mover)
+            iterations += 1
+            if not iterations & 63 and time.perf_counter() >= deadline:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        elapsed = time.perf_counter() - started
+        self.info = {
+            'iterations': iterations,
+            'time': elapsed,
+            'playouts_per_second': iterations / elapsed if elapsed else 0.0,
+            'children': sorted(((self.index[child.move], child.visits, child.rewards[mover] / child.visits)
+                                for child in root.children), key=lambda item: -item[1]),
+        }
+        return self.index[best.move]
+
+    def _iterate(self, node, grid, first, mover):
+        players = self.game.players
+        path = [node]
+        while True:
+            if node.winner is not None:
+                result = node.winner
+                break
+            if node.untried is None:
+                node.untried = self._node_moves(grid, first, mover, node.moves)
+            if node.untried:
+                move = node.untried.pop()
+                child = self._play(node, grid, first, mover, move)
+                node.children.append(child)
+                path.append(child)
+                if child.winner is not None:
+                    result = child.winner
+                else:
+                    result = self._playout(grid, first, (mover + 1) % players, list(child.moves))
+                break
+            if not node.children:
+                result = None  # Nowhere to play: a draw
+                break
+            node = self._select(node, mover)
+            grid[node.move] = mover
+            first[mover] = False
+            path.append(node)
+            mover = (mover + 1) % players
+
+        for visited in path:
+            visited.visits += 1
+            if result is None:
+                for player in range(players):
+                    visited.rewards[player] += 1.0 / players
+            else:
+                visited.rewards[result] += 1.0
+
+    def _select(self, node, mover):
+        # UCT on the mover's own reward
+        log_visits = math.log(node.visits)
+        best, best_value = None, -1.0
+        for child in node.children:
+            value = child.rewards[mover] / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _play(self, node, grid, first, mover, move):
+        grid[move] = mover
+        first[mover] = False
+        known = set(node.moves)
+        moves = [cell for cell in node.moves if cell != move]
+        moves += [move + d for d in self.neighbours if grid[move + d] == EMPTY and move + d not in known]
+        child = Node(move, mover, moves, self.game.players)
+        if self._wins(grid, move, mover):
+            child.winner = mover
+        return child
+
+    def _node_moves(self, grid, first, mover, pool):
+        """Moves to expand for mover, in random order; only the first-move region if it still applies."""
+        region = self.regions[mover] if first[mover] else None
+        if region is None:
+            moves = list(pool)
+        else:
+            allowed = set(region)
+            moves = [cell for cell in pool if cell in allowed]
+            if not moves:
+                moves = [cell for cell in region if grid[cell] == EMPTY][:8]  # Region cells nearest the centre first
+        self.random.shuffle(moves)
+        return moves
+
+    def _playout(self, grid, first, mover, pool):
+        """Play random moves until someone wins; return the winner, or None for a draw or cut-off."""
+        players = self.game.players
+        rand = self.random.random
+        regions = self.regions
+        neighbours = self.neighbours
+        for _ in range(self.playout_limit):
+            if first[mover] and regions[mover] is not None:
+                free = [cell for cell in regions[mover] if grid[cell] == EMPTY]
+                if not free:
+                    return None
+                move = free[int(rand() * len(free))]
+                first[mover] = False
+            else:
+                move = -1
+                while pool:
+                    i = int(rand() * len(pool))
+                    cell = pool[i]
+                    pool[i] = pool[-1]
+                    pool.pop()
+                    if grid[cell] == EMPTY:
+                        move = cell
+                        break
+                if move < 0:
+                    return None
+            grid[move] = mover
+            if self._wins(grid, move, mover):
+                return mover
+            for d in neighbours:
+                if grid[move + d] == EMPTY:
+                    pool.append(move + d)
+            mover = (mover + 1) % players
+        return None
+
+    def _wins(self, grid, move, player):
+        need = self.game.win_condition
+        for step in self.steps:
+            count = 1
+            cell = move + step
+            while grid[cell] == player:
+                count += 1
+                cell += step
+            cell = move - step
+            while grid[cell] == player:
+                count += 1
+                cell -= step
+            if count >= need:
+                return True
+        return False
+
+    def _pool(self, grid):
+        # Free cells next to a stone, or the centre on an empty board
+        pool = set()
+        for index, owner in enumerate(self.game.bits.cells):
+            if owner != EMPTY:
+                p = self.pos[index]
+                pool.update(p + d for d in self.neighbours if grid[p + d] == EMPTY)
+        if not pool:
+            centre = self.game.size // 2
+            return [self.pos[centre * self.game.size + centre]]
+        return sorted(pool)
+
+    def _region_cells(self, limit):
+        # A first-move region as padded positions, nearest the centre first
+        if not limit:
+            return None
+        size = self.game.size
+        centre = size // 2
+        row_min, row_max, col_min, col_max = limit
+        cells = [(max(abs(r - centre), abs(c - centre)), self.pos[r * size + c])
+                 for r in range(row_min, row_max) for c in range(col_min, col_max)]
+        return [p for _, p in sorted(cells)]
@@ -0,0 +1,163 @@
+"""
+Parallel AI search on a pool of worker processes.
+
+Python threads cannot search in parallel, so ParallelSearch keeps one
+process per core, each with its own copy of the game, search engine and
+transposition table.  The pool is started when the ParallelSearch is made
+and reused for every move.  Each task carries the move list of the current
+position, and a worker brings its game up to date by taking back and
+replaying only the moves that differ from its last task.
+
+search() runs the iterative deepening in this process.  Each depth splits
+the root candidates round-robin over the workers, which search their share
+at that depth.  A shared alpha (the best root score any worker has proved)
+lets every worker cut moves that cannot beat another worker's best.
+
+search_mcts() runs an independent Monte Carlo tree per worker, each with its
+own random seed, and adds up the root visit counts (root parallelisation).
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .mcts import MCTS_LEVELS
+from .search import INFINITY, LEVELS, WIN_SCORE
+
+_game = None  # The worker process's own game
+_shared = None  # Best root score proved so far, shared by all workers
+
+
+def _init_worker(factory, settings, shared):
+    global _game, _shared
+    _game = factory(**settings)
+    _shared = shared
+
+
+def _sync(moves, player_limits):
+    # Take back and replay only the moves that changed since the last task
+    game = _game
+    game.player_limits = dict(player_limits)
+    played = list(game.history)
+    common = 0
+    while common < min(len(played), len(moves)) and played[common] == moves[common]:
+        common += 1
+    for _ in range(len(played) - common):
+        game.undo()
+    for index in moves[common:]:
+        game.play(index)
+
+
+def _search_task(moves, player_limits, root_moves, depth, width, time_limit, node_limit):
+    _sync(moves, player_limits)
+    return _game.engine.search_moves(root_moves, depth, width, time_limit, node_limit, _shared)
+
+
+def _mcts_task(moves, player_limits, level, seed, budget):
+    _sync(moves, player_limits)
+    engine = _game.mcts
+    engine.random.seed(seed)
+    engine.search(level, **budget)
+    return engine.info.get('children', [])
+
+
+class ParallelSearch:
+    def __init__(self, game, workers=None):
+        self.game = game
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = multiprocessing.Value('q', -INFINITY)
+        from .game import Gobang  # Workers only need the engine, not a front end
+
+        settings = {
+            'size': game.size,
+            'players': game.players,
+            'win_condition': game.win_condition,
+            'candidate_radius': game.candidate_radius,
+            'table_mb': game.table_mb,
+        }
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(Gobang, settings, self.shared))
+        for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()  # Start every worker now rather than on the first move
+        self.info = {}  # Statistics of the last search
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def _position(self):
+        return list(self.game.history), dict(self.game.player_limits)
+
+    def search(self, level=1, **budget):
+        """Alpha-beta search with the root moves split over the workers; same result type as SearchEngine.search."""
+        settings = dict(LEVELS.get(level, LEVELS[max(LEVELS)]))
+        settings.update(budget)
+        game = self.game
+        engine = game.engine
+        started = time.perf_counter()
+        deadline = started + settings['time_limit']
+        self.info = {}
+
+        engine._start(settings['width'], settings['time_limit'], settings['node_limit'])
+        wins = game.threats.wins[engine.root]
+        if wins:
+            return min(wins)
+        moves = engine.root_moves()
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return moves[0]
+        history, limits = self._position()
+        best, score, depth, nodes = moves[0], 0, 0, 0
+        for depth in range(1, settings['max_depth'] + 1):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                depth -= 1
+                break
+            self.shared.value = -INFINITY
+            chunks = [moves[i::self.workers] for i in range(min(self.workers, len(moves)))]
+            futures = [self.pool.submit(_search_task, history, limits, chunk, depth, settings['width'],
+                                        remaining, settings['node_limit']) for chunk in chunks]
+            results = [future.result() for future in futures]
+            nodes += sum(result[2] for result in results)
+            if not all(result[3] for result in results):
+                depth -= 1
+                break  # Out of time or nodes: keep the last completed depth's move
+            # Only exact scores are compared: a worker whose moves all failed low against the shared
+            # score reports an upper bound, which could tie the true best and win on move order
+            exact = [result for result in results if result[4]] or results
+            score, best = max(exact, key=lambda result: (result[0], -moves.index(result[1])))[:2]  # Ties: earlier move
+            moves.remove(best)
+            moves.insert(0, best)
+            if abs(score) >= WIN_SCORE - 100:
+                break
+        self.info = {
+            'depth': depth,
+            'score': score,
+            'nodes': nodes,
+            'time': time.perf_counter() - started,
+            'workers': self.workers,
+        }
+        return best
+
+    def search_mcts(self, level=1, **budget):
+        """Root-parallel Monte Carlo search: one tree per worker, visit counts merged at the root."""
+        settings = dict(MCTS_LEVELS.get(level, MCTS_LEVELS[max(MCTS_LEVELS)]))
+        settings.update(budget)
+        started = time.perf_counter()
+        history, limits = self._position()
+        seed = time.time_ns()
+        futures = [self.pool.submit(_mcts_task, history, limits, level, seed + worker, settings)
+                   for worker in range(self.workers)]
+        visits = {}
+        for future in futures:
+            for index, count, _ in future.result():
+                visits[index] = visits.get(index, 0) + count
+        self.info = {
+            'iterations': sum(visits.values()),
+            'time': time.perf_counter() - started,
+            'workers': self.workers,
+        }
+        if not visits:
+            return self.game.mcts.search(level, **budget)  # Zero or one candidate: nothing to share out
+        return max(sorted(visits), key=visits.get)
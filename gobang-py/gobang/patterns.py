@@ -0,0 +1,144 @@
+"""
+Pattern tables for move evaluation.
+
+The cells within win_condition - 1 steps on either side of a candidate cell,
+along one direction, are read as a base-3 number: 0 for a free cell, 1 for
+one of the player's stones, 2 for an opponent's stone or the board edge.
+For 5-in-a-row that is an 8-digit key over a 9-cell window with the
+candidate in the middle.  PatternTable classifies every possible key once
+(five, open four, four, open three, ...) and stores its shape and score, so
+scoring a cell is four key builds and four list lookups.
+
+Tables are built on first use and shared by every game with the same
+(win_condition, players).
+"""
+
+from itertools import product
+
+from .bitboard import DIRECTIONS, EMPTY
+
+# Shapes, weakest first
+NONE, ONE, TWO, OPEN_TWO, THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE = range(9)
+
+SHAPE_SCORES = [0, 1, 10, 100, 100, 1000, 1000, 10000, 100000]
+
+# Shape of a line, given the best shape one more stone can turn it into
+PROMOTE = {
+    OPEN_FOUR: OPEN_THREE,
+    FOUR: THREE,
+    OPEN_THREE: OPEN_TWO,
+    THREE: TWO,
+    OPEN_TWO: ONE,
+    TWO: ONE,
+    ONE: ONE,
+    NONE: NONE,
+}
+
+_tables = {}
+_windows = {}  # (size, win_condition) -> PatternEvaluator.windows, shared by every evaluator of that shape
+
+
+def pattern_table(win_condition, players):
+    key = (win_condition, players)
+    if key not in _tables:
+        _tables[key] = PatternTable(win_condition, players)
+    return _tables[key]
+
+
+class PatternTable:
+    def __init__(self, win_condition, players):
+        self.win_condition = win_condition
+        self.reach = win_condition - 1
+        self.weights = list(SHAPE_SCORES)
+        if players > 2:
+            # Several opponents can answer an open shape before it is extended, so it is worth less
+            self.weights[OPEN_THREE] = (self.weights[OPEN_THREE] + self.weights[THREE]) // 2
+            self.weights[OPEN_TWO] = (self.weights[OPEN_TWO] + self.weights[TWO]) // 2
+        self._memo = {}
+        count = 3 ** (2 * self.reach)
+        self.shapes = bytearray(count)
+        # product() yields the digits in key order, most significant (farthest behind the candidate) first
+        for key, digits in enumerate(product(range(3), repeat=2 * self.reach)):
+            self.shapes[key] = self._shape(digits[:self.reach] + (1,) + digits[self.reach:])
+        self.scores = [self.weights[shape] for shape in self.shapes]
+        self._memo = None
+
+    def _shape(self, line):
+        shape = self._memo.get(line)
+        if shape is not None:
+            return shape
+        width = self.win_condition
+        completions = set()
+        for start in range(len(line) - width + 1):
+            window = line[start:start + width]
+            if 2 in window:
+                continue
+            free = [start + i for i, code in enumerate(window) if code == 0]
+            if not free:
+                self._memo[line] = FIVE
+                return FIVE
+            if len(free) == 1:
+                completions.add(free[0])
+        if len(completions) >= 2:
+            shape = OPEN_FOUR
+        elif completions:
+            shape = FOUR
+        else:
+            best = NONE
+            for i, code in enumerate(line):
+                if code == 0:
+                    best = max(best, self._shape(line[:i] + (1,) + line[i + 1:]))
+            shape = PROMOTE[best]
+        self._memo[line] = shape
+        return shape
+
+
+class PatternEvaluator:
+    def __init__(self, bits):
+        self.bits = bits
+        self.table = pattern_table(bits.win_condition, bits.players)
+        size = bits.size
+        reach = bits.win_condition - 1
+        if (size, bits.win_condition) not in _windows:
+            windows = []
+            for index in range(size * size):
+                row, col = divmod(index, size)
+                lines = []
+                for dr, dc in DIRECTIONS:
+                    window = []
+                    for step in list(range(-reach, 0)) + list(range(1, reach + 1)):
+                        r, c = row + dr * step, col + dc * step
+                        window.append(r * size + c if 0 <= r < size and 0 <= c < size else -1)
+                    lines.append(tuple(window))
+                windows.append(lines)
+            _windows[size, bits.win_condition] = windows
+        self.windows = _windows[size, bits.win_condition]  # Per cell and direction: the cells around it, -1 past the board edge
+
+    def key(self, player, index, direction):
+        cells = self.bits.cells
+        key = 0
+        for cell in self.windows[index][direction]:
+            if cell < 0:
+                key = key * 3 + 2
+            else:
+                owner = cells[cell]
+                key = key * 3 + (0 if owner == EMPTY else 1 if owner == player else 2)
+        return key
+
+    def cell_score(self, player, index):
+        """Value of a stone of player on index: its shape in every direction plus combinations."""
+        table = self.table
+        total = fours = threes = 0
+        for direction in range(len(DIRECTIONS)):
+            key = self.key(player, index, direction)
+            total += table.scores[key]
+            shape = table.shapes[key]
+            if shape >= FOUR:
+                fours += 1
+            elif shape == OPEN_THREE:
+                threes += 1
+        if fours >= 2 or (fours and threes):
+            total += table.weights[OPEN_FOUR]  # Double four or four-three wins like an open four
+        elif threes >= 2:
+            total += table.weights[OPEN_THREE]  # Double three
+        return total
@@ -0,0 +1,357 @@
+"""
+Compact binary game records and a readable move-list notation.
+
+    with open('games.gbr', 'ab') as file:
+        RecordWriter(file).write(GameRecord.from_game(game, winner=0))
+    with open('games.gbr', 'rb') as file:
+        for record in read_records(file):
+            ...
+
+    python -m gobang.record games.gbr > games.txt
+    python -m gobang.record games.txt --out games.gbr
+
+A file starts with the magic b'GBGR' and a version byte, followed by the
+games.  Each game is its byte length as a varint, then:
+
+    size, players, win_condition, flags, winner (255: none)   one byte each
+    AI level per player (0: human)                            one byte each
+    limits per player: row_min, row_max, col_min, col_max     only with flag 4; all 0 for none
+    number of moves                                           varint
+    cell index per move                                       one byte, two on boards over 16x16
+    milliseconds per move                                     varints, only with flag 1
+    engine score per move                                     zigzag varints, only with flag 2
+
+A two-player game of 40 moves takes about 50 bytes.  The length prefix
+lets read_records walk a file of any size one game at a time.
+
+The text form has one "key: value" line per field and a blank line
+between games.  Cells are written as in the console game, column letter
+then row number (H8), and limits as their corner cells (I9-O15):
+
+    size: 15
+    players: 3
+    win: 4
+    levels: human 2 3
+    limits: I9-O15 F6-O15 A1-O15
+    winner: O
+    moves: H8 J10 A1 ...
+    times: 120 340 5 ...
+"""
+
+import sys
+
+MAGIC = b'GBGR'
+VERSION = 1
+NO_WINNER = 255
+TIMES, SCORES, LIMITS = 1, 2, 4  # Header flags
+SYMBOLS = ['X', 'O', '#', '@']  # Same order as Gobang.symbols
+
+
+def _put_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data, pos):
+    result = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Game record is truncated")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def cell_name(index, size):
+    """Cell index -> 'H8' (column letter, 1-based row)."""
+    row, col = divmod(index, size)
+    return f"{chr(ord('A') + col)}{row + 1}"
+
+
+def cell_index(name, size):
+    """'H8' -> cell index; ValueError if it is not a cell of the board."""
+    try:
+        col, row = ord(name[0].upper()) - ord('A'), int(name[1:]) - 1
+    except (ValueError, IndexError):
+        raise ValueError(f"Bad cell {name!r}, expected letter + number such as D5") from None
+    if not (0 <= row < size and 0 <= col < size):
+        raise ValueError(f"Cell {name!r} is off the {size}x{size} board")
+    return row * size + col
+
+
+class GameRecord:
+    def __init__(self, size=15, players=2, win_condition=5, levels=None, limits=None, moves=None, times=None,
+                 scores=None, winner=None):
+        self.size = size
+        self.players = players
+        self.win_condition = win_condition
+        self.levels = levels or [None] * players  # AI level per player, None for a human
+        self.limits = limits or {}  # Player -> first-move region, as Gobang.player_limits
+        self.moves = moves or []  # Cell index of every stone, oldest first
+        self.times = times  # Milliseconds per move, or None
+        self.scores = scores  # Engine score per move, or None
+        self.winner = winner  # Player index, or None for a draw or an unfinished game
+        self.check()
+
+    def check(self):
+        """Raise ValueError if the fields do not fit together, so a bad record is never written or replayed."""
+        if self.players not in range(1, len(SYMBOLS) + 1):
+            raise ValueError(f"A game has 1 to {len(SYMBOLS)} players, got {self.players}")
+        if len(self.levels) != self.players:
+            raise ValueError(f"{self.players} players need {self.players} levels, got {len(self.levels)}")
+        if any(player not in range(self.players) for player in self.limits):
+            raise ValueError(f"Limits given for a player beyond the {self.players} in the game")
+        if self.winner is not None and self.winner not in range(self.players):
+            raise ValueError(f"Winner {self.winner} is not one of the {self.players} players")
+        cells = self.size * self.size
+        if any(index not in range(cells) for index in self.moves):
+            raise ValueError(f"A move is off the {self.size}x{self.size} board")
+        if len(set(self.moves)) != len(self.moves):
+            raise ValueError("A cell is played twice")
+        for name, values in (('times', self.times), ('scores', self.scores)):
+            if values is not None and len(values) != len(self.moves):
+                raise ValueError(f"{len(self.moves)} moves need {len(self.moves)} {name}, got {len(values)}")
+
+    @classmethod
+    def from_game(cls, game, winner=None, times=None, scores=None):
+        levels = [game.ai_levels[player] if player < len(game.is_ai) and game.is_ai[player] else None
+                  for player in range(game.players)]
+        return cls(game.size, game.players, game.win_condition, levels, dict(game.player_limits),
+                   list(game.history), times, scores, winner)
+
+    def to_game(self, **options):
+        """A Gobang with this record's rules and players, and its moves played."""
+        from .game import Gobang
+
+        game = Gobang(self.size, self.players, self.win_condition, **options)
+        game.is_ai = [level is not None for level in self.levels]
+        game.ai_levels = list(self.levels)
+        game.player_limits = dict(self.limits)
+        for index in self.moves:
+            game.play(index)
+        return game
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"GameRecord(size={self.size}, players={self.players}, moves={len(self.moves)}, winner={self.winner})"
+
+    def encode(self):
+        """The game as bytes, without the length prefix."""
+        self.check()  # The fields may have changed since the record was made
+        flags = (TIMES if self.times is not None else 0) | (SCORES if self.scores is not None else 0) \
+            | (LIMITS if self.limits else 0)
+        out = bytearray((self.size, self.players, self.win_condition, flags,
+                         NO_WINNER if self.winner is None else self.winner))
+        out += bytes(level or 0 for level in self.levels)
+        if self.limits:
+            for player in range(self.players):
+                out += bytes(self.limits.get(player) or (0, 0, 0, 0))
+        _put_varint(out, len(self.moves))
+        if self.size * self.size <= 256:
+            out += bytes(self.moves)
+        else:
+            for index in self.moves:
+                out += index.to_bytes(2, 'little')
+        for value in self.times or ():
+            _put_varint(out, round(value))
+        for value in self.scores or ():
+            _put_varint(out, value * 2 if value >= 0 else -value * 2 - 1)  # Zigzag: small magnitudes stay short
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        if len(data) < 5:
+            raise ValueError("Game record is truncated")
+        size, players, win_condition, flags, winner = data[:5]
+        pos = 5 + players
+        levels = [level or None for level in data[5:pos]]
+        limits = {}
+        if flags & LIMITS:
+            for player in range(players):
+                region = tuple(data[pos:pos + 4])
+                if any(region):
+                    limits[player] = region
+                pos += 4
+        count, pos = _get_varint(data, pos)
+        width = 1 if size * size <= 256 else 2  # Bytes per cell index
+        if pos + width * count > len(data):
+            raise ValueError("Game record is truncated")
+        if width == 1:
+            moves = list(data[pos:pos + count])
+        else:
+            moves = [int.from_bytes(data[pos + 2 * i:pos + 2 * i + 2], 'little') for i in range(count)]
+        pos += width * count
+        times = scores = None
+        if flags & TIMES:
+            times = []
+            for _ in range(count):
+                value, pos = _get_varint(data, pos)
+                times.append(value)
+        if flags & SCORES:
+            scores = []
+            for _ in range(count):
+                value, pos = _get_varint(data, pos)
+                scores.append(value >> 1 if not value & 1 else -(value >> 1) - 1)
+        return cls(size, players, win_condition, levels, limits, moves, times, scores,
+                   None if winner == NO_WINNER else winner)
+
+    def to_text(self):
+        """The record in the readable notation, one field per line."""
+        size = self.size
+        lines = [
+            f"size: {size}",
+            f"players: {self.players}",
+            f"win: {self.win_condition}",
+            "levels: " + " ".join('human' if level is None else str(level) for level in self.levels),
+        ]
+        if self.limits:
+            regions = []
+            for player in range(self.players):
+                region = self.limits.get(player)
+                if region:
+                    row_min, row_max, col_min, col_max = region
+                    regions.append(cell_name(row_min * size + col_min, size) + '-'
+                                   + cell_name((row_max - 1) * size + col_max - 1, size))
+                else:
+                    regions.append('-')
+            lines.append("limits: " + " ".join(regions))
+        lines.append(f"winner: {'-' if self.winner is None else SYMBOLS[self.winner]}")
+        lines.append("moves: " + " ".join(cell_name(index, size) for index in self.moves))
+        if self.times is not None:
+            lines.append("times: " + " ".join(str(round(value)) for value in self.times))
+        if self.scores is not None:
+            lines.append("scores: " + " ".join(str(value) for value in self.scores))
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_text(cls, text):
+        fields = {}
+        for line in text.splitlines():
+            if line.strip():
+                key, sep, value = line.partition(':')
+                if not sep:
+                    raise ValueError(f"Expected 'key: value', got {line!r}")
+                fields[key.strip()] = value.split()
+        try:
+            size = int(fields['size'][0])
+            players = int(fields['players'][0])
+            win_condition = int(fields['win'][0])
+        except (KeyError, IndexError, ValueError):
+            raise ValueError("A game needs size, players and win lines") from None
+        levels = [None if value == 'human' else int(value) for value in fields.get('levels', [])] or None
+        limits = {}
+        for player, value in enumerate(fields.get('limits', [])):
+            if value != '-':
+                first, _, last = value.partition('-')
+                row_min, col_min = divmod(cell_index(first, size), size)
+                row_max, col_max = divmod(cell_index(last, size), size)
+                limits[player] = (row_min, row_max + 1, col_min, col_max + 1)
+        winner = fields.get('winner', ['-'])[0]
+        moves = [cell_index(name, size) for name in fields.get('moves', [])]
+        times = [int(value) for value in fields['times']] if 'times' in fields else None
+        scores = [int(value) for value in fields['scores']] if 'scores' in fields else None
+        return cls(size, players, win_condition, levels, limits, moves, times, scores,
+                   None if winner == '-' else SYMBOLS.index(winner))
+
+
+class RecordWriter:
+    """Appends games to a binary file opened with 'wb' or 'ab'; the file header is written if the file is empty."""
+
+    def __init__(self, file):
+        self.file = file
+        if file.tell() == 0:
+            file.write(MAGIC + bytes((VERSION,)))
+
+    def write(self, record):
+        data = record.encode()
+        prefix = bytearray()
+        _put_varint(prefix, len(data))
+        self.file.write(prefix + data)
+
+
+def read_records(file):
+    """Yield the GameRecords of a binary file opened with 'rb', one at a time."""
+    for data in read_encoded(file):
+        yield GameRecord.decode(data)
+
+
+def read_encoded(file):
+    """Yield the encoded games of a binary file opened with 'rb', for GameRecord.decode; the framing is checked."""
+    header = file.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a game record file")
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported game record version {header[len(MAGIC)]}")
+    while True:
+        length = shift = 0
+        while True:
+            byte = file.read(1)
+            if not byte:
+                if shift:
+                    raise ValueError("Game record is truncated")
+                return
+            length |= (byte[0] & 0x7F) << shift
+            if byte[0] < 0x80:
+                break
+            shift += 7
+        data = file.read(length)
+        if len(data) != length:
+            raise ValueError("Game record is truncated")
+        yield data
+
+
+def read_text(file):
+    """Yield the GameRecords of a text file, games separated by blank lines."""
+    for text in read_text_games(file):
+        yield GameRecord.from_text(text)
+
+
+def read_text_games(file):
+    """Yield the text of each game of a text file, for GameRecord.from_text."""
+    lines = []
+    for line in file:
+        if line.strip():
+            lines.append(line)
+        elif lines:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m gobang.record',
+                                     description="Convert game records between the binary and text forms")
+    parser.add_argument('path', help="a binary record file, printed as text, or a text file")
+    parser.add_argument('--out', help="binary file the games of a text file are appended to")
+    args = parser.parse_args(argv)
+
+    with open(args.path, 'rb') as file:
+        binary = file.read(len(MAGIC)) == MAGIC
+    if binary:
+        with open(args.path, 'rb') as file:
+            for number, record in enumerate(read_records(file)):
+                sys.stdout.write(("\n" if number else "") + record.to_text())
+    elif args.out:
+        count = 0
+        with open(args.path) as source, open(args.out, 'ab') as target:
+            writer = RecordWriter(target)
+            for record in read_text(source):
+                writer.write(record)
+                count += 1
+        print(f"{count} games -> {args.out}", file=sys.stderr)
+    else:
+        parser.error("a text file needs --out")
+
+
+if __name__ == '__main__':
+    main()
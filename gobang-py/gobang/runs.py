@@ -0,0 +1,47 @@
+"""
+Run-length table for constant-time win detection.
+
+For every player, direction and cell the table stores how many of the
+player's stones sit directly next to the cell going forward, and how many
+going backward.  Placing a stone only changes the two cells just past the
+ends of the run it joins, so make_move updates eight entries per player move
+and "does this cell make win_condition in a row" is four additions.
+
+Entries are kept for every cell, occupied or not, and removals must happen in
+the reverse order of placements, which is how both takebacks and search use
+the table.
+"""
+
+
+class RunTable:
+    def __init__(self, bits):
+        self.bits = bits  # Shares the padded bit layout of the BitBoard
+        self.win_condition = bits.win_condition
+        length = (bits.size + 2) * bits.stride + 1  # Real cells plus the guard rows and column
+        self.forward = [[[0] * length for _ in bits.steps] for _ in range(bits.players)]
+        self.backward = [[[0] * length for _ in bits.steps] for _ in range(bits.players)]
+
+    def place(self, player, index):
+        pos = self.bits.pos[index]
+        for step, forward, backward in zip(self.bits.steps, self.forward[player], self.backward[player]):
+            ahead, behind = forward[pos], backward[pos]
+            total = ahead + behind + 1
+            backward[pos + (ahead + 1) * step] = total  # First cell past the forward end
+            forward[pos - (behind + 1) * step] = total  # First cell past the backward end
+
+    def remove(self, player, index):
+        # Only valid for the most recent stone still on the board
+        pos = self.bits.pos[index]
+        for step, forward, backward in zip(self.bits.steps, self.forward[player], self.backward[player]):
+            ahead, behind = forward[pos], backward[pos]
+            backward[pos + (ahead + 1) * step] = ahead
+            forward[pos - (behind + 1) * step] = behind
+
+    def completes(self, player, index):
+        """True if a stone of player on index makes win_condition in a row."""
+        pos = self.bits.pos[index]
+        need = self.win_condition - 1
+        for forward, backward in zip(self.forward[player], self.backward[player]):
+            if forward[pos] + backward[pos] >= need:
+                return True
+        return False
@@ -0,0 +1,156 @@
+"""
+Incremental per-cell move scores.
+
+ScoreCache keeps, for every player and free cell, the pattern value of a
+stone there (raw) and the evaluate_move priority built from it (value).  The
+pattern keys are kept as well: a stone only changes one base-3 digit in the
+key of each cell within win_condition - 1 steps along the four lines
+through it, so a move costs one addition per affected cell and player, plus
+rescoring those cells.  A lazy-deletion max-heap per player finds the best
+cell without a scan.  Entries that are stale are skipped when they reach the
+top.
+
+Values are a function of the board, so remove() in reverse order of place()
+restores the arrays exactly.
+"""
+
+import heapq
+
+from .bitboard import DIRECTIONS, EMPTY
+from .patterns import FOUR, OPEN_FOUR, OPEN_THREE
+
+DEFENCE_WEIGHT = (4, 5)  # An opponent's value at a cell counts 4/5: attack first when shapes are equal
+CENTRE_BONUS = 5
+
+_layouts = {}  # (size, win_condition) -> (centre, affected), shared by every cache of that shape
+_empty = {}  # (size, win_condition, players) -> keys, raw, totals, value and heaps of an empty board
+
+
+class ScoreCache:
+    def __init__(self, patterns):
+        self.patterns = patterns
+        bits = patterns.bits
+        self.bits = bits
+        self.table = patterns.table
+        self.players = bits.players
+        size = bits.size
+        cells = size * size
+        reach = bits.win_condition - 1
+        shape = (size, bits.win_condition)
+        if shape not in _layouts:
+            centre = size // 2
+            bonus = [CENTRE_BONUS if abs(i // size - centre) <= 1 and abs(i % size - centre) <= 1 else 0
+                     for i in range(cells)]
+            # affected[stone][direction]: (cell, weight of the stone's digit in that cell's key)
+            affected = [[[] for _ in DIRECTIONS] for _ in range(cells)]
+            for cell in range(cells):
+                for direction, window in enumerate(patterns.windows[cell]):
+                    for position, stone in enumerate(window):
+                        if stone >= 0:
+                            affected[stone][direction].append((cell, 3 ** (2 * reach - 1 - position)))
+            _layouts[shape] = (bonus, affected)
+        self.centre, self.affected = _layouts[shape]
+
+        empty = _empty.get(shape + (self.players,)) if not bits.occupied else None
+        if empty is not None:
+            # Every new game starts from the same empty board, so copy its arrays instead of scoring it again
+            keys, raw, totals, value, heaps = empty
+            self.keys = [[list(line) for line in player] for player in keys]
+            self.raw = [list(row) for row in raw]
+            self.totals = list(totals)
+            self.value = [list(row) for row in value]
+            self.heaps = [list(heap) for heap in heaps]
+            return
+        self.keys = [[[patterns.key(player, cell, direction) for cell in range(cells)]
+                      for direction in range(len(DIRECTIONS))] for player in range(self.players)]
+        self.raw = [[self._raw(player, cell) for cell in range(cells)] for player in range(self.players)]
+        self.totals = [sum(raw) for raw in self.raw]  # Sum of raw over the free cells
+        self.value = [[0] * cells for _ in range(self.players)]
+        self.heaps = [[] for _ in range(self.players)]
+        for cell in range(cells):
+            self._revalue(cell)
+        if not bits.occupied:
+            _empty[shape + (self.players,)] = (
+                [[list(line) for line in player] for player in self.keys], [list(row) for row in self.raw],
+                list(self.totals), [list(row) for row in self.value], [list(heap) for heap in self.heaps])
+
+    def _raw(self, player, cell):
+        # Same as PatternEvaluator.cell_score, from the maintained keys
+        table = self.table
+        total = fours = threes = 0
+        for keys in self.keys[player]:
+            key = keys[cell]
+            total += table.scores[key]
+            shape = table.shapes[key]
+            if shape >= FOUR:
+                fours += 1
+            elif shape == OPEN_THREE:
+                threes += 1
+        if fours >= 2 or (fours and threes):
+            total += table.weights[OPEN_FOUR]
+        elif threes >= 2:
+            total += table.weights[OPEN_THREE]
+        return total
+
+    def _revalue(self, cell):
+        raw = [self.raw[player][cell] for player in range(self.players)]
+        for player in range(self.players):
+            defence = max((raw[other] for other in range(self.players) if other != player), default=0)
+            value = raw[player] + defence * DEFENCE_WEIGHT[0] // DEFENCE_WEIGHT[1] + self.centre[cell]
+            self.value[player][cell] = value
+            heapq.heappush(self.heaps[player], (-value, cell))
+
+    def _rescore(self, cell):
+        for player in range(self.players):
+            raw = self._raw(player, cell)
+            self.totals[player] += raw - self.raw[player][cell]
+            self.raw[player][cell] = raw
+        self._revalue(cell)
+
+    def _shift(self, stone, owner, sign):
+        cells = self.bits.cells
+        for direction, affected in enumerate(self.affected[stone]):
+            for player in range(self.players):
+                keys = self.keys[player][direction]
+                digit = sign * (1 if player == owner else 2)
+                for cell, weight in affected:
+                    keys[cell] += digit * weight
+            for cell, _ in affected:
+                if cells[cell] == EMPTY:
+                    self._rescore(cell)
+
+    def place(self, player, index):
+        """Call after the stone is on the board."""
+        for other in range(self.players):
+            self.totals[other] -= self.raw[other][index]
+            self.raw[other][index] = 0
+            self.value[other][index] = 0
+        self._shift(index, player, 1)
+        self._compact()
+
+    def remove(self, player, index):
+        """Call after the stone is off the board; stones must come off in reverse order."""
+        self._shift(index, player, -1)
+        self._rescore(index)
+
+    def _compact(self):
+        # Drop stale heap entries once they outnumber the live ones
+        limit = 4 * len(self.value[0]) + 64
+        for player, heap in enumerate(self.heaps):
+            if len(heap) > limit:
+                values = self.value[player]
+                cells = self.bits.cells
+                heap[:] = [(-values[cell], cell) for cell in range(len(cells)) if cells[cell] == EMPTY]
+                heapq.heapify(heap)
+
+    def best(self, player):
+        """Free cell with the highest value for player (lowest index on ties), or None."""
+        heap = self.heaps[player]
+        values = self.value[player]
+        cells = self.bits.cells
+        while heap:
+            value, cell = heap[0]
+            if cells[cell] == EMPTY and values[cell] == -value:
+                return cell
+            heapq.heappop(heap)
+        return None
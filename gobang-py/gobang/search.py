@@ -0,0 +1,272 @@
+"""
+Alpha-beta search for the Gobang AI.
+
+SearchEngine runs a negamax alpha-beta search with iterative deepening over
+the game's candidate moves.  Each iteration searches the previous principal
+variation first.  A hard time and node budget, set per AI level, bounds every
+call, and the best move found so far is returned when the budget runs out.
+
+With three or four players the search is "paranoid": the player to move at
+the root plays against a coalition of everyone else.  Consecutive moves by
+coalition members keep the score's sign instead of flipping it.
+
+Results are kept in a transposition table keyed by the game's Zobrist key.
+The table belongs to the engine, so it carries over from one move to the next
+within a game.
+"""
+
+import time
+
+from .zobrist import EXACT, LOWER, UPPER, TranspositionTable
+
+WIN_SCORE = 1000000  # Score of a won position, minus the plies it takes to get there
+WON = WIN_SCORE - 1000  # Scores beyond this are forced wins or losses
+INFINITY = 10 * WIN_SCORE
+
+# AI difficulty -> search budget.  width is how many ordered candidates each node expands.
+LEVELS = {
+    1: {'max_depth': 2, 'time_limit': 0.5, 'node_limit': 2000, 'width': 8},
+    2: {'max_depth': 4, 'time_limit': 1.5, 'node_limit': 20000, 'width': 10},
+    3: {'max_depth': 8, 'time_limit': 4.0, 'node_limit': 100000, 'width': 12},
+}
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget is used up."""
+
+
+class SearchEngine:
+    def __init__(self, game, table_mb=16):
+        self.game = game
+        self.table = TranspositionTable(table_mb)
+        self.pv = []  # Principal variation of the last finished iteration
+        self.info = {}  # Statistics of the last search
+
+    def search(self, level=1, **budget):
+        """Best cell index for the player to move, or None if there is no free cell."""
+        settings = dict(LEVELS.get(level, LEVELS[max(LEVELS)]))
+        settings.update(budget)
+        game = self.game
+        self.info = {}
+        started = time.perf_counter()
+        self._start(settings['width'], settings['time_limit'], settings['node_limit'])
+
+        wins = game.threats.wins[self.root]
+        if wins:
+            return min(wins)
+        moves = self.root_moves()
+        if not moves:
+            return None
+        best, score, depth = moves[0], 0, 0
+        base = len(game.history)
+        for depth in range(1, settings['max_depth'] + 1):
+            try:
+                score, move = self._search_root(moves, depth)
+            except SearchTimeout:
+                while len(game.history) > base:
+                    game.undo()
+                if self.partial is not None:
+                    best = self.partial  # The previous best is searched first, so this is at least as good
+                depth -= 1
+                break
+            best = move
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - 100:
+                break  # Forced result found, deeper search cannot change it
+        self.info = {
+            'depth': depth,
+            'score': score,
+            'nodes': self.nodes,
+            'time': time.perf_counter() - started,
+            'pv': list(self.pv),
+            'table': self.table.stats(),
+        }
+        return best
+
+    def search_moves(self, moves, depth, width, time_limit, node_limit, shared=None):
+        """
+        One fixed-depth pass over the given root moves, for the parallel search.
+        shared is a multiprocessing.Value holding the best root score found by
+        any process so far; it is read before and raised after every move.
+        Returns (score, move, nodes, finished, exact).  exact is False when
+        every move failed low against the shared score: score is then only an
+        upper bound, and another process holds a better move.
+        """
+        game = self.game
+        self._start(width, time_limit, node_limit)
+        base = len(game.history)
+        try:
+            score, move = self._search_root(moves, depth, shared)
+        except SearchTimeout:
+            while len(game.history) > base:
+                game.undo()
+            return -INFINITY, self.partial, self.nodes, False, False
+        return score, move, self.nodes, True, self.exact
+
+    def _start(self, width, time_limit, node_limit):
+        game = self.game
+        self.root = game.current_player
+        self.width = width
+        self.node_limit = node_limit
+        self.deadline = time.perf_counter() + time_limit
+        self.nodes = 0
+        self.pv = []
+        self.partial = None
+        self.salt = game.zobrist.root[self.root] if game.players > 2 else 0  # Paranoid scores depend on the root player
+        self.table.new_search()
+
+    def root_moves(self):
+        """Ordered root candidates for the player to move, the table move first."""
+        entry = self.table.probe(self.game.key ^ self.salt)
+        return self.ordered_moves(self.root, 0, entry[3] if entry else -1)
+
+    def _search_root(self, moves, depth, shared=None):
+        game = self.game
+        alpha, beta = -INFINITY, INFINITY
+        best_move, best_score = None, -INFINITY
+        self.partial = None
+        self.exact = False  # Whether best_score is a true score rather than a fail-low bound
+        pv_table = [[] for _ in range(depth + 1)]
+        for move in moves:
+            if shared is not None and shared.value > alpha:
+                alpha = shared.value  # Another process already has a root move this good
+            game.play(move)
+            if self.same_side(game.current_player, self.root):
+                score = self._negamax(depth - 1, alpha, beta, 1, pv_table)
+            else:
+                score = -self._negamax(depth - 1, -beta, -alpha, 1, pv_table)
+            game.undo()
+            if best_move is None or score > best_score:
+                best_move, best_score = move, score
+                self.partial = move
+                self.exact = score > alpha or alpha == -INFINITY  # Failing low only bounds the score from above
+            if score > alpha or alpha == -INFINITY:
+                alpha = score
+                pv_table[0] = [move] + pv_table[1]
+                if shared is not None:
+                    with shared.get_lock():
+                        if score > shared.value:
+                            shared.value = score
+        self.pv = pv_table[0]
+        return best_score, best_move
+
+    def _negamax(self, depth, alpha, beta, ply, pv_table):
+        self.nodes += 1
+        if self.nodes >= self.node_limit or time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        game = self.game
+        mover = game.current_player
+        pv_table[ply] = []
+        if game.threats.wins[mover]:
+            return WIN_SCORE - ply
+        if game.moves_played == game.size * game.size:
+            return 0  # Draw
+        if depth <= 0:
+            return self.evaluate(mover)
+
+        key = game.key ^ self.salt
+        entry = self.table.probe(key)
+        hint = -1
+        if entry:
+            stored_depth, stored, flag, hint = entry
+            if stored_depth >= depth:
+                score = from_table(stored, ply)
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        moves = self.ordered_moves(mover, ply, hint)
+        if not moves:
+            return -(WIN_SCORE - ply - 1)  # Cannot stop a coalition win from inside the first-move region
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = None
+        for move in moves:
+            game.play(move)
+            if self.same_side(game.current_player, mover):
+                score = self._negamax(depth - 1, alpha, beta, ply + 1, pv_table)
+            else:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, pv_table)
+            game.undo()
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    pv_table[ply] = [move] + pv_table[ply + 1]
+                    if alpha >= beta:
+                        break
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        self.table.store(key, depth, to_table(best, ply), flag, best_move)
+        return best
+
+    def same_side(self, player, other):
+        return (player == self.root) == (other == self.root)
+
+    def ordered_moves(self, mover, ply, hint=-1):
+        """Candidate moves for mover, best first, cut to the search width.  hint is a table move to try first."""
+        game = self.game
+        threats = game.threats
+        region = game.first_move_region(mover)
+        forced = set()
+        for player in range(game.players):
+            if not self.same_side(player, mover):
+                forced |= threats.wins[player]
+        if forced:
+            # An opponent wins next turn unless every such cell is taken
+            moves = sorted(forced)
+            if region:
+                row_min, row_max, col_min, col_max = region
+                moves = [m for m in moves
+                         if row_min <= m // game.size < row_max and col_min <= m % game.size < col_max]
+            if hint in moves:
+                moves.remove(hint)
+                moves.insert(0, hint)
+            return moves
+        symbol = game.symbols[mover]
+        candidates = game.candidates.moves(region)
+        scored = []
+        for move in candidates:
+            score = game.evaluate_move(move // game.size, move % game.size, symbol)
+            scored.append((-score, move))
+        scored.sort()
+        moves = [move for _, move in scored[:self.width]]
+        for first in (hint, self.pv[ply] if ply < len(self.pv) else -1):
+            if first in candidates:
+                if first in moves:
+                    moves.remove(first)
+                moves.insert(0, first)  # Principal variation first, then the table move
+        return moves
+
+    def evaluate(self, mover):
+        """Static score of the position from mover's point of view."""
+        game = self.game
+        score = 0
+        for player in range(game.players):
+            value = game.score_cache.totals[player]  # What the free cells are worth to player
+            if player == mover:
+                value += value // 2  # Having the move makes every threat worth more
+            score += value if self.same_side(player, mover) else -value
+        return score
+
+def to_table(score, ply):
+    # Forced results are stored relative to the node so they stay valid at any depth
+    if score >= WON:
+        return score + ply
+    if score <= -WON:
+        return score - ply
+    return score
+
+
+def from_table(score, ply):
+    if score >= WON:
+        return score - ply
+    if score <= -WON:
+        return score + ply
+    return score
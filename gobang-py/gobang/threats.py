@@ -0,0 +1,122 @@
+"""
+Immediate-threat index.
+
+For every player the index keeps three sets of free cells:
+
+    wins        playing there makes win_condition in a row
+    fours       playing there leaves at least one cell that would then win
+    open_fours  playing there leaves two or more such cells on one line,
+                which a single reply cannot stop
+
+A stone only changes the status of free cells within win_condition - 1 steps
+along the four lines through it, so update() rescans just those cells, and
+only in the direction of the line they share with the stone.  Because the
+status is recomputed from the board, calling update() after removing a stone
+restores the index exactly.
+"""
+
+from .bitboard import DIRECTIONS, EMPTY
+
+_segments = {}  # (size, win_condition) -> segments table, shared by every index of that shape
+
+
+class ThreatIndex:
+    def __init__(self, bits, runs):
+        self.bits = bits
+        self.runs = runs
+        self.win_condition = bits.win_condition
+        cells = bits.size * bits.size
+        key = (bits.size, self.win_condition)
+        if key not in _segments:
+            _segments[key] = [[self._segment(i, d) for d in range(len(DIRECTIONS))] for i in range(cells)]
+        self.segments = _segments[key]
+        self.four_dirs = [[0] * cells for _ in range(bits.players)]  # Directions in which a cell makes a four
+        self.open_dirs = [[0] * cells for _ in range(bits.players)]  # Directions in which it makes an open four
+        self.wins = [set() for _ in range(bits.players)]
+        self.fours = [set() for _ in range(bits.players)]
+        self.open_fours = [set() for _ in range(bits.players)]
+
+    def _segment(self, index, direction):
+        """Cells within win_condition - 1 steps of index along direction, and the position of index in them."""
+        size = self.bits.size
+        row, col = divmod(index, size)
+        dr, dc = DIRECTIONS[direction]
+        reach = self.win_condition - 1
+        segment = []
+        centre = 0
+        for step in range(-reach, reach + 1):
+            r, c = row + dr * step, col + dc * step
+            if 0 <= r < size and 0 <= c < size:
+                if step == 0:
+                    centre = len(segment)
+                segment.append(r * size + c)
+        return segment, centre
+
+    def completions(self, player, index, direction):
+        """Number of distinct cells (0, 1 or 2+) that would win along direction after player plays index."""
+        segment, centre = self.segments[index][direction]
+        cells = self.bits.cells
+        width = self.win_condition
+        codes = [0 if cell == EMPTY else 1 if cell == player else 2 for cell in map(cells.__getitem__, segment)]
+        codes[centre] = 1
+        blocked = empty = empty_at = 0
+        found = -1
+        for i, code in enumerate(codes):
+            if code == 0:
+                empty += 1
+                empty_at += i
+            elif code == 2:
+                blocked += 1
+            if i >= width:
+                old = codes[i - width]
+                if old == 0:
+                    empty -= 1
+                    empty_at -= i - width
+                elif old == 2:
+                    blocked -= 1
+            if i >= width - 1 and not blocked and empty == 1:
+                if found < 0:
+                    found = empty_at  # With one free cell in the window, empty_at is its position
+                elif empty_at != found:
+                    return 2
+        return 0 if found < 0 else 1
+
+    def _rescan(self, index, direction):
+        for player in range(self.bits.players):
+            bit = 1 << direction
+            made = self.completions(player, index, direction)
+            self.four_dirs[player][index] = (self.four_dirs[player][index] & ~bit) | (bit if made else 0)
+            self.open_dirs[player][index] = (self.open_dirs[player][index] & ~bit) | (bit if made > 1 else 0)
+            self._file(player, index)
+
+    def _file(self, player, index):
+        # Move index into or out of the player's sets to match its current status
+        if self.runs.completes(player, index):
+            self.wins[player].add(index)
+        else:
+            self.wins[player].discard(index)
+        if self.four_dirs[player][index]:
+            self.fours[player].add(index)
+        else:
+            self.fours[player].discard(index)
+        if self.open_dirs[player][index]:
+            self.open_fours[player].add(index)
+        else:
+            self.open_fours[player].discard(index)
+
+    def update(self, index):
+        """Refresh the index after a stone was placed on or removed from index."""
+        cells = self.bits.cells
+        if cells[index] == EMPTY:
+            for direction in range(len(DIRECTIONS)):
+                self._rescan(index, direction)
+        else:
+            for player in range(self.bits.players):
+                self.four_dirs[player][index] = self.open_dirs[player][index] = 0
+                self.wins[player].discard(index)
+                self.fours[player].discard(index)
+                self.open_fours[player].discard(index)
+        for direction in range(len(DIRECTIONS)):
+            for cell in self.segments[index][direction][0]:
+                if cell != index and cells[cell] == EMPTY:
+                    self._rescan(cell, direction)
@@ -0,0 +1,359 @@
+"""
+Self-play tournaments between AI settings.
+
+    python -m gobang.tournament L1=1 L2=2 --games 200 --workers 8 --out l1-l2.jsonl
+    python -m gobang.tournament A=1 B=1,engine=mcts C=2 --players 3 --win 4
+    python -m gobang.tournament L1=1 L2=2 --record games.gbr
+
+Each entrant is NAME=LEVEL followed by optional settings:
+    engine=alphabeta|mcts, a search budget such as time_limit=0.5 or
+    iterations=3000 (see LEVELS and MCTS_LEVELS), or the Gobang options
+    candidate_radius and backend.
+
+Games run on a process pool.  Every game opens with a few random stones
+from a seeded generator, and each opening is played once per seating of
+the entrants, so no entrant keeps the first move.  Each seat has its own
+Gobang and so its own transposition table.  Finished games are appended to the
+JSONL file right away, and with --record also to a binary game record
+file (see record.py).  The summary at the end gives win, draw and loss
+rates, Elo with a 95% interval, the average move time and the
+nodes per second of every entrant.
+
+Elo is fitted with a Bradley-Terry model.  In a game of three or four,
+the winner beats each other entrant and a draw is half a point for every
+pair.  The interval comes from the fit's Fisher information with one
+virtual draw per pair and a weak prior, so a handful of one-sided games
+still gives a wide interval.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import permutations
+
+from .game import Gobang
+from .record import GameRecord, RecordWriter
+
+GAME_OPTIONS = ('candidate_radius', 'backend')
+PRIOR_ELO = 400  # Standard deviation of the weak prior on every rating, in Elo points
+
+_seats = {}  # Worker cache: (players, win_condition, seat, game options) -> Gobang
+
+
+def parse_entrant(spec):
+    """'NAME=LEVEL[,key=value...]' -> (name, settings dict)."""
+    name, _, rest = spec.partition('=')
+    if not name or not rest:
+        raise ValueError(f"Entrant {spec!r} should look like NAME=LEVEL[,key=value...]")
+    level, *options = rest.split(',')
+    settings = {'level': int(level)}
+    for option in options:
+        key, _, value = option.partition('=')
+        for kind in (int, float):
+            try:
+                value = kind(value)
+                break
+            except ValueError:
+                pass
+        settings[key] = value
+    return name, settings
+
+
+def _seat_game(players, win_condition, seat, settings, table_mb):
+    options = tuple(sorted((key, settings[key]) for key in GAME_OPTIONS if key in settings))
+    key = (players, win_condition, seat, options)
+    game = _seats.get(key)
+    if game is None:
+        game = _seats[key] = Gobang(players=players, win_condition=win_condition, table_mb=table_mb, **dict(options))
+        game.set_player_limits()
+    while game.history:
+        game.undo()
+    game.engine.table.clear()  # Games stay independent of each other
+    return game
+
+
+def play_game(number, lineup, players, win_condition, opening, seed, table_mb):
+    """Play one game; lineup is (name, settings) per seat.  Returns the record written to the JSONL file."""
+    games = [_seat_game(players, win_condition, seat, settings, table_mb)
+             for seat, (_, settings) in enumerate(lineup)]
+    referee = games[0]
+    size = referee.size
+    rng = random.Random(seed)
+    moves = []
+    times = [0.0] * players
+    clock = []  # Milliseconds per move, 0 for the opening stones
+    nodes = [0] * players
+    counts = [0] * players
+    winner = None
+    for ply in range(size * size):
+        player = referee.current_player
+        elapsed = 0.0
+        if ply < opening:
+            candidates = referee.candidates.moves(referee.first_move_region(player))
+            if not candidates:
+                break
+            index = rng.choice(candidates)
+        else:
+            game = games[player]
+            settings = dict(lineup[player][1])
+            level = settings.pop('level')
+            for key in GAME_OPTIONS:
+                settings.pop(key, None)
+            started = time.perf_counter()
+            move = game.get_ai_move(level, **settings)
+            elapsed = time.perf_counter() - started
+            times[player] += elapsed
+            nodes[player] += game.ai_info.get('nodes', 0)
+            counts[player] += 1
+            if move is None:
+                break  # Nowhere this player may move
+            index = move[0] * size + move[1]
+        for game in games:
+            game.play(index)
+        moves.append(index)
+        clock.append(round(1000 * elapsed))
+        if referee.check_winner(index // size, index % size):
+            winner = player
+            break
+    return {
+        'type': 'game',
+        'game': number,
+        'seed': seed,
+        'players': players,
+        'win_condition': win_condition,
+        'seats': [name for name, _ in lineup],
+        'winner': winner,
+        'moves': moves,
+        'move_ms': clock,
+        'move_time': times,
+        'ai_moves': counts,
+        'nodes': nodes,
+    }
+
+
+def pair_scores(record):
+    """(a, b, score of a) for every pair of different entrants in a game record."""
+    seats = record['seats']
+    winner = record['winner']
+    pairs = []
+    for i in range(len(seats)):
+        for j in range(i + 1, len(seats)):
+            if seats[i] == seats[j]:
+                continue
+            if winner is None:
+                score = 0.5
+            elif winner == i:
+                score = 1.0
+            elif winner == j:
+                score = 0.0
+            else:
+                continue  # A third player won: says nothing about these two
+            pairs.append((seats[i], seats[j], score))
+    return pairs
+
+
+def _pair_games(names, records):
+    # Points scored by each entrant and games between each pair, with one virtual draw per pair
+    index = {name: i for i, name in enumerate(names)}
+    count = len(names)
+    score = [0.0] * count
+    games = [[0.0] * count for _ in range(count)]
+    for a in range(count):
+        for b in range(count):
+            if a != b:
+                games[a][b] = 1.0  # The virtual draw, half a point each way
+        score[a] += 0.5 * (count - 1)
+    for record in records:
+        for a, b, result in pair_scores(record):
+            a, b = index[a], index[b]
+            games[a][b] += 1
+            games[b][a] += 1
+            score[a] += result
+            score[b] += 1 - result
+    return score, games
+
+
+def fit_elo(names, records, iterations=200):
+    """Bradley-Terry ratings on the Elo scale, averaging 0.  Every pair gets one virtual draw to keep them finite."""
+    score, games = _pair_games(names, records)
+    count = len(names)
+    strength = [1.0] * count
+    for _ in range(iterations):
+        for i in range(count):
+            total = sum(games[i][j] / (strength[i] + strength[j]) for j in range(count) if j != i)
+            strength[i] = score[i] / total if total else strength[i]
+        mean = sum(math.log(s) for s in strength) / count
+        strength = [s / math.exp(mean) for s in strength]
+    return [400 * math.log10(s) for s in strength]
+
+
+def _inverse(matrix):
+    # Gauss-Jordan; the matrices here are one row per entrant
+    size = len(matrix)
+    rows = [list(row) + [float(i == j) for j in range(size)] for i, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        head = rows[column][column]
+        rows[column] = [value / head for value in rows[column]]
+        for row in range(size):
+            if row != column and rows[row][column]:
+                factor = rows[row][column]
+                rows[row] = [value - factor * lead for value, lead in zip(rows[row], rows[column])]
+    return [row[size:] for row in rows]
+
+
+def elo_errors(names, records, elo):
+    """
+    Half-width of the 95% interval of each rating, from the Fisher information of the Bradley-Terry fit
+    (the virtual draws included) plus a weak normal prior on every rating.  Unlike a bootstrap this stays
+    wide when few games were played or one entrant won them all.
+    """
+    _, games = _pair_games(names, records)
+    count = len(names)
+    scale = 400 / math.log(10)  # Elo points per unit of log strength
+    strength = [10 ** (rating / 400) for rating in elo]
+    information = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        information[i][i] = 1 / (PRIOR_ELO / scale) ** 2
+        for j in range(count):
+            if j != i:
+                p = strength[i] / (strength[i] + strength[j])
+                information[i][i] += games[i][j] * p * (1 - p)
+                information[i][j] -= games[i][j] * p * (1 - p)
+    covariance = _inverse(information)
+    errors = []
+    for i in range(count):
+        # Ratings are shown relative to the average, so take the variance of r_i - mean(r)
+        weights = [(i == j) - 1 / count for j in range(count)]
+        variance = sum(weights[a] * covariance[a][b] * weights[b] for a in range(count) for b in range(count))
+        errors.append(1.96 * scale * math.sqrt(max(variance, 0.0)))
+    return errors
+
+
+def summarize(names, records):
+    elo = fit_elo(names, records)
+    errors = elo_errors(names, records, elo)
+    rows = []
+    for i, name in enumerate(names):
+        played = won = drawn = ai_moves = nodes = 0
+        move_time = 0.0
+        for record in records:
+            seats = [seat for seat, entrant in enumerate(record['seats']) if entrant == name]
+            if not seats:
+                continue
+            played += 1
+            won += record['winner'] in seats
+            drawn += record['winner'] is None
+            for seat in seats:
+                ai_moves += record['ai_moves'][seat]
+                nodes += record['nodes'][seat]
+                move_time += record['move_time'][seat]
+        rows.append({
+            'name': name,
+            'games': played,
+            'win_rate': won / played if played else 0.0,
+            'draw_rate': drawn / played if played else 0.0,
+            'loss_rate': (played - won - drawn) / played if played else 0.0,
+            'elo': elo[i],
+            'elo_error': errors[i],
+            'move_time_ms': 1000 * move_time / ai_moves if ai_moves else 0.0,
+            'nodes_per_second': nodes / move_time if move_time else 0.0,
+        })
+    return rows
+
+
+def lineups(entrants, players, games):
+    # Every seating of distinct entrants (or, with fewer entrants than seats, every rotation);
+    # each opening is replayed for all of them
+    if len(entrants) >= players:
+        seatings = list(permutations(entrants, players))
+    else:
+        seatings = [[entrants[(seat + shift) % len(entrants)] for seat in range(players)]
+                    for shift in range(players)]
+    for number in range(games):
+        opening, seating = divmod(number, len(seatings))
+        yield number, opening, list(seatings[seating])
+
+
+def run(entrants, players=2, win_condition=5, games=100, workers=None, out=None, opening=2, seed=1, table_mb=4,
+        record_file=None):
+    """
+    Play the tournament and return the summary rows; game records are appended to out as they finish,
+    and to the binary file record_file if given.
+    """
+    names = [name for name, _ in entrants]
+    levels = {name: settings['level'] for name, settings in entrants}
+    records = []
+    stream = open(out, 'a') if out else None
+    archive = open(record_file, 'ab') if record_file else None
+    if archive:
+        writer = RecordWriter(archive)
+        rules = Gobang(players=players, win_condition=win_condition, table_mb=1, book=None)
+        rules.set_player_limits()
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+            futures = [pool.submit(play_game, number, lineup, players, win_condition, opening,
+                                   seed * 1000003 + game_opening, table_mb)
+                       for number, game_opening, lineup in lineups(entrants, players, games)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                records.append(record)
+                if stream:
+                    stream.write(json.dumps(record) + '\n')
+                    stream.flush()
+                if archive:
+                    writer.write(GameRecord(rules.size, players, win_condition,
+                                            [levels[name] for name in record['seats']], dict(rules.player_limits),
+                                            record['moves'], record['move_ms'], winner=record['winner']))
+                winner = record['seats'][record['winner']] if record['winner'] is not None else 'draw'
+                print(f"[{done}/{games}] game {record['game']}: {' vs '.join(record['seats'])} -> {winner}",
+                      file=sys.stderr)
+        rows = summarize(names, records)
+        if stream:
+            stream.write(json.dumps({'type': 'summary', 'time': time.perf_counter() - started, 'entrants': rows}) + '\n')
+    finally:
+        if stream:
+            stream.close()
+        if archive:
+            archive.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gobang.tournament', description="AI self-play tournament with Elo")
+    parser.add_argument('entrants', nargs='+', help="NAME=LEVEL[,key=value...], at least two")
+    parser.add_argument('--players', type=int, default=2, choices=(2, 3, 4))
+    parser.add_argument('--win', type=int, default=5, choices=(4, 5), help="stones in a row to win")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--opening', type=int, default=2, help="random stones before the AIs take over")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--table-mb', type=int, default=4, help="transposition table per seat and worker")
+    parser.add_argument('--out', help="JSONL file the games and the summary are appended to")
+    parser.add_argument('--record', help="binary game record file the games are appended to")
+    args = parser.parse_args(argv)
+    try:
+        entrants = [parse_entrant(spec) for spec in args.entrants]
+    except ValueError as error:
+        parser.error(str(error))
+    if len(entrants) < 2 or len({name for name, _ in entrants}) != len(entrants):
+        parser.error("give at least two entrants with different names")
+
+    rows = run(entrants, args.players, args.win, args.games, args.workers, args.out, args.opening, args.seed,
+               args.table_mb, args.record)
+    print(f"{'entrant':<12} {'games':>5} {'win':>6} {'draw':>6} {'loss':>6} {'elo':>13} {'ms/move':>8} {'nodes/s':>8}")
+    for row in rows:
+        print(f"{row['name']:<12} {row['games']:>5} {row['win_rate']:>6.1%} {row['draw_rate']:>6.1%} "
+              f"{row['loss_rate']:>6.1%} {row['elo']:>+6.0f} ±{row['elo_error']:<5.0f} "
+              f"{row['move_time_ms']:>8.1f} {row['nodes_per_second']:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
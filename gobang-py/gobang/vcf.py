@@ -0,0 +1,169 @@
+"""
+Threat-space solver for forced wins.
+
+ThreatSolver looks for a win by continuous fours (VCF) and then for a win
+by continuous threats (VCT) for the player to move.  It only tries forcing
+moves: fours, whose single reply is known, and open threes, whose replies
+are the free cells on the three's lines plus any counter-four.  Because the
+tree is so narrow it reaches 20+ plies in a few thousand nodes.
+
+Proofs are conservative.  If the defender can win, or answer a threat with
+a four of their own that the attacker cannot meet with a four, the line is
+treated as unproven rather than guessed at.  Forcing sequences need a single
+defender, so the solver only runs in two-player games.
+"""
+
+import time
+
+
+class SolverTimeout(Exception):
+    """Raised when the solver's node or time budget is used up."""
+
+
+class ThreatSolver:
+    def __init__(self, game, vcf_depth=24, vct_depth=8, node_limit=20000, time_limit=0.25):
+        self.game = game
+        self.vcf_depth = vcf_depth  # Plies, attacker and defender moves together
+        self.vct_depth = vct_depth
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.nodes = 0
+
+    def solve(self, vct=True, time_limit=None):
+        """
+        Cell index that starts a forced win for the player to move, or None.
+        time_limit, if given, caps the solver's own limit (the caller's remaining budget).
+        """
+        game = self.game
+        if game.players != 2:
+            return None
+        self._begin(time_limit)
+        base = len(game.history)
+        try:
+            move = self._attack(self.vcf_depth, threes=False)
+            if move is None and vct:
+                move = self._attack(self.vct_depth, threes=True)
+        except SolverTimeout:
+            while len(game.history) > base:
+                game.undo()
+            move = None
+        return move
+
+    def proves(self, move, vct=True, time_limit=None):
+        """
+        True if move, played by the player to move, starts a forced win the solver can prove:
+        every defence loses.  False when it cannot be proven within the budget.
+        """
+        game = self.game
+        if game.players != 2:
+            return False
+        self._begin(time_limit)
+        if move in game.threats.wins[self.attacker]:
+            return True
+        base = len(game.history)
+        before = set(game.threats.open_fours[self.attacker])
+        game.play(move)
+        # As in _attack, only a four or a new open three forces the reply that _defend expects
+        three = bool(game.threats.open_fours[self.attacker] - before)
+        try:
+            won = self._defend(self.vcf_depth - 1, False, move) \
+                or vct and three and self._defend(self.vct_depth - 1, True, move)
+        except SolverTimeout:
+            won = False
+        while len(game.history) > base:
+            game.undo()
+        return won
+
+    def _begin(self, time_limit):
+        game = self.game
+        self.attacker = game.current_player
+        self.defender = 1 - self.attacker
+        self.nodes = 0
+        self.deadline = time.perf_counter() + (self.time_limit if time_limit is None else min(self.time_limit, time_limit))
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes >= self.node_limit or time.perf_counter() >= self.deadline:
+            raise SolverTimeout()
+
+    def _attack(self, depth, threes):
+        """Winning attacker move at this node, or None.  The attacker is to move."""
+        self._tick()
+        game = self.game
+        threats = game.threats
+        attacker, defender = self.attacker, self.defender
+        if threats.wins[attacker]:
+            return min(threats.wins[attacker])
+        must_block = threats.wins[defender]
+        if len(must_block) > 1:
+            return None
+        if not must_block and not threats.fours[defender] and threats.open_fours[attacker]:
+            return min(threats.open_fours[attacker])  # Two winning cells next turn, nothing can interfere
+        if depth <= 0:
+            return None
+
+        moves = sorted(threats.fours[attacker])
+        if threes and not must_block and not threats.open_fours[attacker]:
+            moves += [move for move in self._three_moves() if move not in threats.fours[attacker]]
+        if must_block:
+            moves = [move for move in moves if move in must_block and move in threats.fours[attacker]]
+        for move in moves:
+            game.play(move)
+            won = self._defend(depth - 1, threes, move)
+            game.undo()
+            if won:
+                return move
+        return None
+
+    def _defend(self, depth, threes, threat):
+        """True if every defender reply to the attacker's last move still loses."""
+        self._tick()
+        game = self.game
+        threats = game.threats
+        attacker, defender = self.attacker, self.defender
+        if threats.wins[defender]:
+            return False  # The defender wins first
+        blocks = threats.wins[attacker]
+        if len(blocks) > 1:
+            return True
+        if blocks:
+            replies = list(blocks)  # A four: the only reply is to block it
+        else:
+            if not threes:
+                return False
+            if not threats.open_fours[attacker]:
+                return False  # Not a three after all
+            replies = self._line_cells(threat) | threats.fours[defender]
+        for reply in sorted(replies):
+            game.play(reply)
+            won = self._attack(depth - 1, threes) is not None
+            game.undo()
+            if not won:
+                return False
+        return True
+
+    def _line_cells(self, index):
+        # Free cells that could still break a three through index
+        game = self.game
+        cells = set()
+        for segment, _ in game.threats.segments[index]:
+            cells.update(cell for cell in segment if game.bits.is_empty(cell))
+        return cells
+
+    def _three_moves(self):
+        """Attacker moves that create a new open-four cell, i.e. make an open three."""
+        game = self.game
+        bits = game.bits
+        threats = game.threats
+        attacker = self.attacker
+        need = game.win_condition - 3  # Stones that must already share a window with the move
+        before = set(threats.open_fours[attacker])
+        found = []
+        for move in sorted(game.candidates.cells):
+            if not any(bits.count(attacker, mask) >= need for mask in bits.line_masks[move]):
+                continue
+            game.play(move)
+            if threats.open_fours[attacker] - before:
+                found.append(move)
+            game.undo()
+        return found
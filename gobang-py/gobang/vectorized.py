@@ -0,0 +1,153 @@
+"""
+NumPy backend for whole-board evaluation and win detection.
+
+VectorBoard mirrors the game as a size x size int8 array (-1 for a free cell,
+otherwise the player index) and computes, with array operations over every
+cell at once:
+
+    line_counts    stones of a player in every win_condition-long window,
+                   per direction, from strided sliding windows
+    check_winner   the same answer as Gobang.check_winner
+    values         the evaluate_move score of every cell for every player,
+                   built from base-3 pattern keys of shifted board slices and
+                   the same PatternTable the pure-Python path uses
+
+It is meant for scoring many positions in batch analysis.  The search keeps
+using the incremental pure-Python caches, which are faster for one move at a
+time.  NumPy is optional and only needed when this backend is selected.
+"""
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # Optional dependency, see Gobang(backend='numpy')
+    np = None
+
+from .bitboard import DIRECTIONS
+from .patterns import FOUR, OPEN_FOUR, OPEN_THREE
+from .scorecache import CENTRE_BONUS, DEFENCE_WEIGHT
+
+EMPTY_CELL = -1
+
+
+class VectorBoard:
+    def __init__(self, game):
+        if np is None:
+            raise ImportError("backend='numpy' needs NumPy: pip install numpy")
+        self.game = game
+        self.size = game.size
+        self.players = game.players
+        self.win_condition = game.win_condition
+        self.table = game.patterns.table
+        self.scores = np.array(self.table.scores, dtype=np.int64)
+        self.shapes = np.frombuffer(bytes(self.table.shapes), dtype=np.uint8)
+        self.array = np.full((self.size, self.size), EMPTY_CELL, dtype=np.int8)
+        reach = self.win_condition - 1
+        self.offsets = list(range(-reach, 0)) + list(range(1, reach + 1))  # Same digit order as PatternEvaluator
+        self.powers = [3 ** (2 * reach - 1 - position) for position in range(2 * reach)]
+        centre = self.size // 2
+        self.centre = np.zeros((self.size, self.size), dtype=np.int64)
+        self.centre[max(0, centre - 1):centre + 2, max(0, centre - 1):centre + 2] = CENTRE_BONUS
+        self._values = None  # values() of the current position, dropped on every move
+
+    def place(self, player, index):
+        self.array.flat[index] = player
+        self._values = None
+
+    def remove(self, index):
+        self.array.flat[index] = EMPTY_CELL
+        self._values = None
+
+    def _direction_windows(self, mask, direction):
+        # Every win_condition-long window along direction, as a (windows, win_condition) view
+        width = self.win_condition
+        dr, dc = DIRECTIONS[direction]
+        if (dr, dc) == (0, 1):
+            return sliding_window_view(mask, width, axis=1).reshape(-1, width)
+        if (dr, dc) == (1, 0):
+            return sliding_window_view(mask, width, axis=0).reshape(-1, width)
+        if dc == -1:
+            mask = mask[:, ::-1]  # Anti-diagonals are diagonals of the mirrored board
+        diagonals = [np.diagonal(mask, offset) for offset in range(-(self.size - width), self.size - width + 1)]
+        return np.concatenate([sliding_window_view(line, width) for line in diagonals])
+
+    def line_counts(self, player):
+        """Per direction, the number of player's stones in each win_condition-long window."""
+        mask = (self.array == player).astype(np.int8)
+        return [self._direction_windows(mask, direction).sum(axis=1) for direction in range(len(DIRECTIONS))]
+
+    def check_winner(self, row, col):
+        """Same result as Gobang.check_winner for the stone on row, col."""
+        symbol = self.game.board[row][col]
+        if symbol not in self.game.symbols:
+            return False
+        player = self.game.symbols.index(symbol)
+        mask = self.array == player
+        lines = [
+            (mask[row, :], col),
+            (mask[:, col], row),
+            (np.diagonal(mask, col - row), min(row, col)),
+            (np.diagonal(mask[:, ::-1], (self.size - 1 - col) - row), min(row, self.size - 1 - col)),
+        ]
+        width = self.win_condition
+        for line, at in lines:
+            if len(line) < width:
+                continue
+            windows = sliding_window_view(line, width)
+            first, last = max(0, at - width + 1), min(at, len(line) - width)
+            if windows[first:last + 1].all(axis=1).any():
+                return True
+        return False
+
+    def keys(self, player):
+        """Base-3 pattern key of every cell, shape (4, size, size)."""
+        reach = self.win_condition - 1
+        size = self.size
+        digits = np.where(self.array == EMPTY_CELL, 0, np.where(self.array == player, 1, 2)).astype(np.int64)
+        padded = np.pad(digits, reach, constant_values=2)  # The edge counts as a blocker
+        keys = np.zeros((len(DIRECTIONS), size, size), dtype=np.int64)
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            for offset, power in zip(self.offsets, self.powers):
+                r, c = reach + dr * offset, reach + dc * offset
+                keys[direction] += padded[r:r + size, c:c + size] * power
+        return keys
+
+    def raw(self, player):
+        """PatternEvaluator.cell_score of every cell for player."""
+        keys = self.keys(player)
+        shapes = self.shapes[keys]
+        total = self.scores[keys].sum(axis=0)
+        fours = (shapes >= FOUR).sum(axis=0)
+        threes = (shapes == OPEN_THREE).sum(axis=0)
+        weights = self.table.weights
+        combo = (fours >= 2) | ((fours > 0) & (threes > 0))
+        total += np.where(combo, weights[OPEN_FOUR], np.where(threes >= 2, weights[OPEN_THREE], 0))
+        return total
+
+    def values(self):
+        """evaluate_move of every cell for every player, shape (players, size, size); occupied cells are 0."""
+        if self._values is not None:
+            return self._values
+        raw = np.stack([self.raw(player) for player in range(self.players)])
+        values = np.empty_like(raw)
+        for player in range(self.players):
+            others = [other for other in range(self.players) if other != player]
+            defence = raw[others].max(axis=0) if others else 0
+            values[player] = raw[player] + defence * DEFENCE_WEIGHT[0] // DEFENCE_WEIGHT[1] + self.centre
+        values[:, self.array != EMPTY_CELL] = 0
+        self._values = values
+        return values
+
+    def pick(self, player, cells):
+        """Highest-valued (row, col) in cells, earliest on ties, like pick_valid_move."""
+        if not cells:
+            return None
+        rows, cols = np.array(cells).T
+        return tuple(cells[int(np.argmax(self.values()[player, rows, cols]))])
+
+    def best(self, player):
+        """Free cell with the highest value for player (lowest index on ties), or None."""
+        values = np.where(self.array == EMPTY_CELL, self.values()[player], np.iinfo(np.int64).min)
+        if (self.array != EMPTY_CELL).all():
+            return None
+        return int(np.argmax(values))
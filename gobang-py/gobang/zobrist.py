@@ -0,0 +1,107 @@
+"""
+Zobrist position keys and a fixed-size transposition table.
+
+Zobrist gives every (player, cell) pair and every player-to-move a random
+64-bit number; a position's key is the XOR of the numbers of its stones and
+of the player to move, so one move changes it with three XORs.  The numbers
+come from a fixed seed, which keeps keys identical between runs and
+processes.
+
+TranspositionTable stores search results in two flat arrays of 64-bit
+words, so its memory use is exactly what was asked for.  Every bucket has a
+depth-preferred slot and an always-replace slot.
+"""
+
+import random
+from array import array
+
+MAX_PLAYERS = 4
+SEED = 0x60BA46  # Fixed so keys stay the same across runs
+
+_numbers = {}  # (size, seed) -> (cells, turn, root), shared by every Zobrist of that size
+
+EXACT, LOWER, UPPER = 0, 1, 2  # Kind of score stored: exact, at least (fail high), at most (fail low)
+
+SCORE_OFFSET = 1 << 30  # Scores are stored biased so they pack as unsigned
+
+
+class Zobrist:
+    def __init__(self, size=15, seed=SEED):
+        if (size, seed) not in _numbers:
+            rng = random.Random(seed)
+            cells = [[rng.getrandbits(64) for _ in range(size * size)] for _ in range(MAX_PLAYERS)]
+            turn = [rng.getrandbits(64) for _ in range(MAX_PLAYERS)]
+            root = [rng.getrandbits(64) for _ in range(MAX_PLAYERS)]  # Salt for searches that depend on who is searching
+            _numbers[size, seed] = (cells, turn, root)
+        self.cells, self.turn, self.root = _numbers[size, seed]
+
+
+class TranspositionTable:
+    SLOT_BYTES = 16  # One key word and one data word
+
+    def __init__(self, size_mb=16):
+        self.buckets = max(1, size_mb * 1024 * 1024 // (2 * self.SLOT_BYTES))
+        self.keys = array('Q', [0]) * (2 * self.buckets)
+        self.data = array('Q', [0]) * (2 * self.buckets)
+        self.generation = 0  # Bumped once per search so old entries are replaced first
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.keys = array('Q', [0]) * len(self.keys)
+        self.data = array('Q', [0]) * len(self.data)
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    @staticmethod
+    def _pack(depth, score, flag, move, generation):
+        # generation:8 | depth:8 | flag:2 | move+1:10 | score:31
+        return generation | depth << 8 | flag << 16 | (move + 1) << 18 | (score + SCORE_OFFSET) << 28
+
+    @staticmethod
+    def _unpack(word):
+        depth = word >> 8 & 0xFF
+        flag = word >> 16 & 0x3
+        move = (word >> 18 & 0x3FF) - 1
+        score = (word >> 28) - SCORE_OFFSET
+        return depth, score, flag, move
+
+    def probe(self, key):
+        """(depth, score, flag, move) stored for key, or None.  move is -1 if none was stored."""
+        slot = (key % self.buckets) * 2
+        keys = self.keys
+        if keys[slot] == key:
+            self.hits += 1
+            return self._unpack(self.data[slot])
+        if keys[slot + 1] == key:
+            self.hits += 1
+            return self._unpack(self.data[slot + 1])
+        if keys[slot] or keys[slot + 1]:
+            self.collisions += 1  # Bucket holds other positions
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, move=None):
+        slot = (key % self.buckets) * 2
+        word = self._pack(min(depth, 0xFF), score, flag, -1 if move is None else move, self.generation)
+        old = self.data[slot]
+        if (self.keys[slot] == key or not self.keys[slot]
+                or old & 0xFF != self.generation or depth >= old >> 8 & 0xFF):
+            self.keys[slot] = key  # Depth-preferred slot: gives way to its own position, stale or shallower entries
+        else:
+            slot += 1  # Always-replace slot
+            self.keys[slot] = key
+        self.data[slot] = word
+        self.stores += 1
+
+    def stats(self):
+        used = len(self.keys) - self.keys.count(0)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'fill': used / len(self.keys),
+            'size_mb': len(self.keys) * self.SLOT_BYTES / (1024 * 1024),
+        }
@@ -137,5 +137,6 @@ class Gobang:
                 print("Invalid move! Try again.")
 
 # Start the game
-game = Gobang()
-game.start_game()
+if __name__ == '__main__':
+    game = Gobang()
+    game.start_game()
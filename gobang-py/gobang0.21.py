@@ -165,5 +165,6 @@ class Gobang:
         self.root.mainloop()
 
 # Start the game
-game = Gobang()
-game.start_game()
+if __name__ == '__main__':
+    game = Gobang()
+    game.start_game()
@@ -207,5 +207,6 @@ class Gobang:
         self.root.after(100, self.check_ai_move)
 
 # Start the game
-game = Gobang()
-game.start_game()
+if __name__ == '__main__':
+    game = Gobang()
+    game.start_game()
@@ -17,6 +17,7 @@ class Gobang:
         self.first_move = [True] * self.players  # Track if it's the player's first move
         self.set_player_limits()  # Initialize move limits
         self.game_over = False  # Track if the game is over
+        self.history = []  # (row, col, player, was it their first move) for every stone, for takeback
         self.init_ui()  # Initialize the UI
 
     def display_board(self):
@@ -104,6 +105,7 @@ class Gobang:
                     return False
 
         # 3. 执行移动
+        self.history.append((row, col, self.current_player, self.first_move[self.current_player]))
         self.board[row][col] = self.symbols[self.current_player]
         self.moves_played += 1
         self.display_board()
@@ -125,6 +127,28 @@ class Gobang:
         self.update_message(f"Player {self.symbols[self.current_player]}'s turn")
         return True
 
+    def undo(self):
+        # Take back the newest stone and give the turn back to whoever played it
+        row, col, player, first_move = self.history.pop()
+        self.board[row][col] = '.'
+        self.moves_played -= 1
+        self.current_player = player
+        self.first_move[player] = first_move
+        if self.game_over:
+            self.game_over = False
+            self.canvas.bind("<Button-1>", self.click_event)
+
+    def take_back(self, event=None):
+        # 悔棋：撤销上一步，以及其后电脑玩家的落子，直到轮到人类玩家
+        if not self.history:
+            self.update_message("Nothing to take back!")
+            return
+        self.undo()
+        while self.history and self.is_ai[self.current_player]:
+            self.undo()
+        self.update_board()
+        self.update_message(f"Player {self.symbols[self.current_player]}'s turn")
+
     def check_winner(self, row, col):
         directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
         for dr, dc in directions:
@@ -200,6 +224,9 @@ class Gobang:
         self.canvas = tk.Canvas(self.root, width=self.size * 40, height=self.size * 40)
         self.canvas.pack()
         self.canvas.bind("<Button-1>", self.click_event)
+        self.undo_button = tk.Button(self.root, text="Undo", command=self.take_back)
+        self.undo_button.pack()
+        self.root.bind("<Control-z>", self.take_back)
         self.draw_board()
 
     def draw_board(self):
@@ -244,5 +271,6 @@ class Gobang:
         self.root.after(100, self.check_ai_move)
 
 # Start the game
-game = Gobang()
-game.start_game()
+if __name__ == '__main__':
+    game = Gobang()
+    game.start_game()
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from gobang.record import GameRecord, RecordWriter, read_records
+
+TEXT = """size: 15
+players: 3
+win: 5
+levels: 1 human 2
+limits: I9-O15 F6-O15 -
+winner: O
+moves: H8 J10 A1
+times: 120 340 5
+"""
+
+
+def round_trip(record):
+    file = io.BytesIO()
+    RecordWriter(file).write(record)
+    file.seek(0)
+    return list(read_records(file))
+
+
+def test_text_and_binary_round_trip():
+    record = GameRecord.from_text(TEXT)
+    assert round_trip(record) == [record]
+    assert GameRecord.from_text(record.to_text()) == record
+
+
+def test_levels_must_match_players():
+    with pytest.raises(ValueError, match="3 players need 3 levels"):
+        GameRecord.from_text(TEXT.replace("levels: 1 human 2", "levels: 1 1"))
+
+
+def test_bad_record_is_refused_before_writing():
+    record = GameRecord.from_text(TEXT)
+    record.levels = [1, 1]
+    file = io.BytesIO()
+    writer = RecordWriter(file)
+    with pytest.raises(ValueError):
+        writer.write(record)
+    assert file.getvalue() == b'GBGR\x01'  # Only the file header, no partial game
+
+
+def test_times_must_match_moves():
+    with pytest.raises(ValueError, match="3 moves need 3 times"):
+        GameRecord.from_text(TEXT.replace("times: 120 340 5", "times: 120"))
+
+
+@pytest.mark.parametrize('players', [0, 5])
+def test_players_must_be_one_to_four(players):
+    with pytest.raises(ValueError, match="1 to 4 players"):
+        GameRecord(players=players, levels=[None] * players)
+
+
+def test_winner_must_be_a_player():
+    with pytest.raises(ValueError, match="Winner 3 is not one of the 3 players"):
+        GameRecord.from_text(TEXT.replace("winner: O", "winner: @"))
+
+
+def test_moves_must_be_on_the_board():
+    with pytest.raises(ValueError, match="off the 15x15 board"):
+        GameRecord(moves=[112, 225])
+
+
+def test_cells_are_played_once():
+    with pytest.raises(ValueError, match="played twice"):
+        GameRecord.from_text(TEXT.replace("moves: H8 J10 A1", "moves: H8 J10 H8"))
+
+
+def test_malformed_binary_record_is_refused():
+    data = bytearray(GameRecord.from_text(TEXT).encode())
+    data[4] = 3  # winner: a fourth player in a three-player game
+    with pytest.raises(ValueError, match="Winner 3"):
+        GameRecord.decode(bytes(data))
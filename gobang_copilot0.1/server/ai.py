@@ -0,0 +1,180 @@
+"""
+AI moves for the rooms, searched on a bounded pool of worker processes.
+
+A search takes seconds of CPU, so it never runs in a request thread: the
+request takes a snapshot of the room (Room.position), hands it to a worker
+process and waits for the answer without holding the room lock, so moves in
+this and every other room go on as usual.  Workers run at a lower priority
+than the server, which keeps plain moves quick while the workers are busy.
+
+Each request has a time budget that counts from the moment it is accepted:
+time spent waiting for a worker is taken off the search, and a task whose
+budget ran out before a worker picked it up is dropped unsearched.
+At most max_pending searches are accepted at once (running or queued);
+beyond that submit() raises Busy straight away instead of making the caller
+wait.  Searches wait in the pool's own queue until a worker is free, so
+closing the room can always cancel one that has not started; a room has at
+most one search at a time.  A search already running finishes
+within its budget and its move is thrown away.
+
+A worker that dies (killed for memory, say) breaks the whole executor: the
+searches it held fail, the pool is dropped, and the next search starts a
+fresh one.
+
+Each worker keeps one game per rule set and brings it up to date by taking
+back and replaying only the moves that differ from its last task, so a
+room's consecutive AI moves also share the transposition table.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from rooms import BOARD_SIZE, Gobang, MoveError
+
+MAX_TIME = 5.0  # Longest search budget a request may ask for, in seconds
+GRACE = 1.0  # Extra seconds a request waits for its worker beyond the budget
+WORKER_NICE = 10  # Scheduling priority drop of the workers, so request threads get the CPU first
+
+_games = {}  # Worker cache: (players, win_condition) -> Gobang
+
+
+class Busy(Exception):
+    """Every slot of the pool is taken; the caller should try again shortly."""
+
+
+def _init_worker():
+    try:
+        os.nice(WORKER_NICE)
+    except OSError:  # Not allowed on this system: run at normal priority
+        pass
+
+
+def _think(position, level, deadline):
+    # Runs in a worker.  The deadline is wall-clock time, the one clock all processes share.
+    time_limit = deadline - time.time()
+    if time_limit <= 0:
+        return None  # Waited in the queue until the budget was gone
+    key = (position['players'], position['win_condition'])
+    game = _games.get(key)
+    if game is None:
+        game = _games[key] = Gobang(size=BOARD_SIZE, players=key[0], win_condition=key[1])
+    moves = position['moves']
+    played = list(game.history)
+    common = 0
+    while common < min(len(played), len(moves)) and played[common] == moves[common]:
+        common += 1
+    for _ in range(len(played) - common):
+        game.undo()
+    for index in moves[common:]:
+        game.play(index)
+    game.player_limits = dict(position['limits'])
+    move = game.get_ai_move(level, time_limit=time_limit)
+    return move, game.ai_info
+
+
+class AIPool:
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers  # Searches running or queued at most
+        self.queue = deque()  # (future, position, level, deadline) waiting for a free worker
+        self.running = 0
+        # Taken after a room's lock, never before; reentrant, as a task that is already done runs its callback
+        # inside _dispatch
+        self.lock = threading.RLock()
+        self.pool = None  # Started by the first search
+
+    def submit(self, room, level, time_limit):
+        """Queue a search for room's next move; returns (future, position, deadline).  Raises Busy or MoveError."""
+        position = room.position()
+        deadline = time.time() + min(time_limit, MAX_TIME)
+        with room.lock:
+            if room.thinking is not None and not room.thinking.done():
+                raise MoveError("The AI is already thinking in this room")
+            future = Future()  # Ours, not the executor's, so it can be cancelled until a worker takes it
+            with self.lock:
+                if self.running + len(self.queue) >= self.max_pending:
+                    raise Busy(f"The AI is busy with {self.running + len(self.queue)} searches, try again shortly")
+                self.queue.append((future, position, level, deadline))
+                self._dispatch()
+            room.thinking = future
+        future.add_done_callback(self._dequeue)
+        return future, position, deadline
+
+    def _dispatch(self):
+        # Under self.lock: start queued searches while workers are free
+        while self.queue and self.running < self.workers:
+            future, position, level, deadline = self.queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            if deadline <= time.time():
+                future.set_result(None)  # Its budget ran out in the queue
+                continue
+            if self.pool is None:
+                # Spawned, not forked: the server has threads, and the workers need none of its memory
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=_init_worker)
+            pool = self.pool
+            try:
+                task = pool.submit(_think, position, level, deadline)
+            except BrokenProcessPool as error:  # A worker died before the searches it held reported it
+                self._drop(pool)
+                future.set_exception(error)
+                continue
+            self.running += 1
+            task.add_done_callback(lambda task, future=future, pool=pool: self._finished(task, future, pool))
+
+    def _drop(self, pool):
+        # Under self.lock: forget a broken executor, so the next search starts a new one
+        if self.pool is pool:
+            self.pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, task, future, pool):
+        with self.lock:
+            self.running -= 1
+            if isinstance(task.exception(), BrokenProcessPool):
+                self._drop(pool)
+            self._dispatch()
+        if task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _dequeue(self, future):
+        if future.cancelled():
+            with self.lock:
+                self.queue = deque(item for item in self.queue if item[0] is not future)
+
+    def move(self, room, level=2, time_limit=2.0):
+        """
+        Search and play the AI's move for the player to move in room.
+        Returns (row, col, symbol, winner, seq, info); raises Busy, or MoveError if the move cannot be played.
+        """
+        future, position, deadline = self.submit(room, level, time_limit)
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.time()) + GRACE)
+        except CancelledError:
+            raise MoveError("Room is closed")
+        except BrokenProcessPool:
+            raise MoveError("The AI's worker stopped, try again")
+        except TimeoutError:
+            future.cancel()
+            raise MoveError("The AI ran out of time")
+        if result is None or result[0] is None:
+            raise MoveError("The AI ran out of time" if result is None else "No free cell")
+        (row, col), info = result
+        winner, seq = room.move(row, col, position['symbol'], seq=len(position['moves']))
+        return row, col, position['symbol'], winner, seq, info
+
+    def close(self):
+        with self.lock:
+            queued, self.queue = self.queue, deque()
+        for future, _, _, _ in queued:
+            future.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
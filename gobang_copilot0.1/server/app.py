@@ -1,29 +1,115 @@
+import math
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS  # 允许跨域请求
 
+from ai import AIPool, Busy
+from rooms import Full, MoveError, Rooms
+from wire import MEDIA_TYPES, negotiate
+
 app = Flask(__name__)
 CORS(app)
 
-BOARD_SIZE = 15
-EMPTY_CELL = '.'
-board = [[EMPTY_CELL] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+rooms = Rooms()  # Every game the server hosts, by room id
+DEFAULT_ROOM = 'default'  # The room /move plays in, for the single-board client
+rooms.create(DEFAULT_ROOM, permanent=True)  # Never closed: the legacy client has no other
+ai = AIPool()  # Worker processes for AI moves, started by the first one
 
 @app.route("/", methods=["GET"])
 def home():
     return "Flask server is running!"
 
-@app.route('/move', methods=['POST'])
-def move():
-    data = request.json
-    row = data.get('row')
-    col = data.get('col')
-    symbol = data.get('symbol')
+@app.route('/rooms', methods=['POST'])
+def create_room():
+    data = request.get_json(silent=True) or {}
+    try:
+        room = rooms.create(players=data.get('players', 2), win_condition=data.get('win_condition', 5),
+                            limits=data.get('limits'))
+    except ValueError as error:
+        return jsonify(success=False, message=str(error)), 400
+    except Full as error:
+        return jsonify(success=False, message=str(error)), 503, {'Retry-After': '60'}
+    return jsonify(success=True, room=room.id, symbols=room.game.symbols)
+
+@app.route('/rooms/<room_id>', methods=['GET'])
+def room_state(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify(success=False, message="No such room"), 404
+    encoding = negotiate(request.accept_mimetypes)  # The board's encoding, picked by the Accept header
+    response = jsonify(success=True, **room.state(encoding))
+    response.content_type = MEDIA_TYPES[encoding]
+    response.vary.add('Accept')
+    return response
 
-    if board[row][col] != EMPTY_CELL:
-        return jsonify(success=False, message="Cell already taken")
+@app.route('/rooms/<room_id>/moves', methods=['GET'])
+def room_moves(room_id):
+    # ?since=N gives the moves after seq N; with &wait=S the request waits up to S (whole) seconds for one
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify(success=False, message="No such room"), 404
+    try:
+        since = int(request.args.get('since', '0'))
+        wait = int(request.args.get('wait', '0'))
+        if since < 0 or wait < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify(success=False, message="since and wait must be whole numbers of 0 or more"), 400
+    try:
+        delta = room.wait_since(since, wait) if wait > 0 else room.moves_since(since)
+    except ValueError as error:
+        return jsonify(success=False, message=str(error)), 400
+    return jsonify(success=True, **delta)
 
-    board[row][col] = symbol
+@app.route('/rooms/<room_id>', methods=['DELETE'])
+def close_room(room_id):
+    try:
+        room = rooms.close(room_id)
+    except ValueError as error:
+        return jsonify(success=False, message=str(error)), 403
+    if room is None:
+        return jsonify(success=False, message="No such room"), 404
     return jsonify(success=True)
 
+@app.route('/rooms/<room_id>/move', methods=['POST'])
+def room_move(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify(success=False, message="No such room"), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        winner, seq = room.move(data.get('row'), data.get('col'), data.get('symbol'))
+    except MoveError as error:
+        return jsonify(success=False, message=str(error))
+    return jsonify(success=True, winner=winner, seq=seq)
+
+@app.route('/rooms/<room_id>/ai-move', methods=['POST'])
+def room_ai_move(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify(success=False, message="No such room"), 404
+    data = request.get_json(silent=True) or {}
+    level, time_limit = data.get('level', 2), data.get('time_limit', 2.0)
+    # type(), not isinstance(), so JSON true/false are refused; isfinite() refuses NaN and Infinity, which Flask parses
+    if type(level) is not int or type(time_limit) not in (int, float) or not math.isfinite(time_limit) \
+            or time_limit <= 0:
+        return jsonify(success=False, message="level must be an integer and time_limit a positive number"), 400
+    try:
+        row, col, symbol, winner, seq, info = ai.move(room, level, time_limit)
+    except Busy as error:
+        return jsonify(success=False, busy=True, message=str(error)), 503, {'Retry-After': '1'}
+    except MoveError as error:
+        return jsonify(success=False, message=str(error))
+    return jsonify(success=True, row=row, col=col, symbol=symbol, winner=winner, seq=seq,
+                   stage=info['stage'])
+
+@app.route('/move', methods=['POST'])
+def move():
+    return room_move(DEFAULT_ROOM)
+
+@app.route('/ai-move', methods=['POST'])
+def ai_move():
+    return room_ai_move(DEFAULT_ROOM)
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=True, threaded=True)
@@ -0,0 +1,124 @@
+"""
+Load generator for ws.py.
+
+    python ws.py &
+    python loadgen.py --rooms 1000 --spectators 2 --moves 30
+
+Creates the rooms over HTTP, then connects two players and the spectators
+to every room over WebSocket.  In every room the players take turns
+playing random free cells until the game ends or --moves is reached, each
+player waiting for its own move to come back before the other one plays.
+Every client notes when each move reaches it.  Latency is measured from the
+moment the player sent the move, so all times come from one clock.  The
+report gives moves per second, messages delivered per second and the
+latency percentiles over all deliveries.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from websockets.asyncio.client import connect
+
+
+def create_room(http):
+    request = urllib.request.Request(f"{http}/rooms", data=b'{"players": 2}', method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)['room']
+
+
+class RoomLoad:
+    def __init__(self, room, ws, spectators, moves, rng):
+        self.url = f"{ws}/rooms/{room}"
+        self.spectators = spectators
+        self.moves = moves
+        self.rng = rng
+        self.sent = {}  # Move number -> time it was sent
+        self.latencies = []
+        self.delivered = 0
+        self.echo = asyncio.Event()  # Set when the player who just moved sees the move
+        self.finished = False
+
+    async def open(self, gate):
+        async with gate:
+            self.players = [await connect(f"{self.url}?symbol={symbol}") for symbol in 'XO']
+            self.watchers = [await connect(self.url) for _ in range(self.spectators)]
+        self.readers = [asyncio.create_task(self.read(connection, seat))
+                        for seat, connection in enumerate(self.players + self.watchers)]
+
+    async def read(self, connection, seat):
+        async for text in connection:
+            message = json.loads(text)
+            if message['type'] != 'move':
+                continue
+            self.latencies.append(time.perf_counter() - self.sent[message['seq']])
+            self.delivered += 1
+            if seat < 2 and message['symbol'] == 'XO'[seat]:
+                self.finished = message['winner'] is not None
+                self.echo.set()
+
+    async def play(self):
+        free = list(range(225))
+        self.rng.shuffle(free)
+        played = 0
+        for played in range(1, self.moves + 1):
+            row, col = divmod(free.pop(), 15)
+            self.echo.clear()
+            self.sent[played] = time.perf_counter()
+            await self.players[(played - 1) % 2].send(json.dumps({'row': row, 'col': col}))
+            await self.echo.wait()
+            if self.finished:
+                break
+        return played
+
+    async def close(self):
+        for connection in self.players + self.watchers:
+            await connection.close()
+        await asyncio.gather(*self.readers, return_exceptions=True)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+async def run(args):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(16) as pool:
+        ids = await asyncio.gather(*(loop.run_in_executor(pool, create_room, args.http) for _ in range(args.rooms)))
+    print(f"created {len(ids)} rooms in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(args.seed)
+    loads = [RoomLoad(room, args.ws, args.spectators, args.moves, random.Random(rng.random())) for room in ids]
+    gate = asyncio.Semaphore(100)  # Connections being opened at once
+    started = time.perf_counter()
+    await asyncio.gather(*(load.open(gate) for load in loads))
+    connections = len(loads) * (2 + args.spectators)
+    print(f"opened {connections} connections in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    moves = sum(await asyncio.gather(*(load.play() for load in loads)))
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*(load.close() for load in loads))
+
+    latencies = sorted(latency for load in loads for latency in load.latencies)
+    delivered = sum(load.delivered for load in loads)
+    print(f"{moves} moves in {elapsed:.1f}s: {moves / elapsed:.0f} moves/s, {delivered / elapsed:.0f} messages/s")
+    print("latency ms: " + " ".join(f"p{100 * q:g}={1000 * percentile(latencies, q):.1f}"
+                                    for q in (0.5, 0.9, 0.99, 0.999)) + f" max={1000 * latencies[-1]:.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="WebSocket load generator for ws.py")
+    parser.add_argument('--http', default='http://localhost:5000')
+    parser.add_argument('--ws', default='ws://localhost:8765')
+    parser.add_argument('--rooms', type=int, default=200)
+    parser.add_argument('--spectators', type=int, default=2, help="watchers per room besides the two players")
+    parser.add_argument('--moves', type=int, default=30, help="moves per room at most")
+    parser.add_argument('--seed', type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,241 @@
+"""
+Game rooms for the web server.
+
+Every room owns a headless Gobang from gobang-py, which enforces the turn
+order and the first-move limits and finds a win from the run lengths next
+to the new stone, so a move costs the same however full the board is.
+Each room has its own lock: requests for one room are applied one at a
+time, and requests for different rooms never wait for each other.  The
+registry lock is only held to add or remove a room.
+
+The registry holds at most max_rooms rooms.  A room that nobody has asked
+for in idle seconds and nobody is watching is closed the next time a room
+is created; permanent rooms (the legacy client's) are never closed.
+
+Transports that push updates (ws.py) add a listener to the room.  Every
+accepted move is serialised to JSON once, under the room lock so the
+messages keep the order of the moves, and the same text is handed to
+every listener.
+
+Moves are numbered: a room's seq is the number of moves played so far,
+so it only ever grows.  A client that knows the room up to some
+seq asks for the moves since then (moves_since, or wait_since to block
+until there is one) and gets them as a short list of cells instead of the
+whole board.
+
+AI moves are searched in another process (ai.py) from a snapshot of the
+room's moves, without holding the room lock; the result is played only if
+no other move was made meanwhile and the room is still open.
+"""
+
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+
+# The rules and AI come from the headless engine package in gobang-py/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'gobang-py'))
+from gobang import Gobang  # noqa: E402
+from wire import encode_board  # noqa: E402
+
+BOARD_SIZE = 15
+MAX_WAIT = 30.0  # Longest a client may wait for a new move, in seconds
+MAX_ROOMS = 10000  # Rooms the server hosts at most
+ROOM_IDLE = 3600.0  # Seconds without a request after which an unwatched room is closed
+EXPIRE_EVERY = 60.0  # Seconds between two sweeps for idle rooms
+
+
+class MoveError(ValueError):
+    """A move the room refuses; the message is meant for the player."""
+
+
+class Full(Exception):
+    """The server hosts max_rooms rooms already; the caller should try again later."""
+
+
+class Room:
+    def __init__(self, room_id, players=2, win_condition=5, limits=None):
+        if type(players) is not int or players not in (2, 3, 4) or type(win_condition) is not int \
+                or win_condition not in (4, 5):
+            raise ValueError("A room needs 2-4 players and a win condition of 4 or 5")
+        if limits is not None and type(limits) is not bool:
+            raise ValueError("limits must be true or false: the regions themselves are fixed by the player count")
+        self.id = room_id
+        # No transposition table: AI moves are searched elsewhere, so a room only keeps the board
+        self.game = Gobang(size=BOARD_SIZE, players=players, win_condition=win_condition, table_mb=0, book=None)
+        if limits is None:
+            limits = players > 2  # First moves confined to their regions, as in the console game
+        if limits:
+            self.game.set_player_limits()
+        self.lock = threading.Lock()  # Held while a move is checked and played
+        self.changed = threading.Condition(self.lock)  # Notified after every move and when the room closes
+        self.winner = None  # Symbol of the winner once the game is over
+        self.listeners = []  # Called with the JSON text of every accepted move, under the room lock
+        self.thinking = None  # Future of the AI move being searched for this room, if any
+        self.closed = False
+        self.used = time.monotonic()  # When the room was last asked for, for closing idle rooms
+
+    def move(self, row, col, symbol, seq=None):
+        """
+        Play symbol's stone at row, col (0-based); returns the winner's symbol or None and the move's seq.
+        Raises MoveError.
+        With seq, the move is only played if the room has seen exactly seq moves so far.
+        """
+        game = self.game
+        # type(), not isinstance(): JSON true and false arrive as bools, which are ints to isinstance
+        if not (type(row) is int and type(col) is int and 0 <= row < game.size and 0 <= col < game.size):
+            raise MoveError("Cell is off the board")
+        with self.lock:
+            if self.closed:
+                raise MoveError("Room is closed")
+            if seq is not None and seq != game.moves_played:
+                raise MoveError("The board changed in the meantime")
+            if self.winner is not None or game.moves_played == game.size * game.size:
+                raise MoveError("Game is over")
+            index = row * game.size + col
+            if not game.bits.is_empty(index):
+                raise MoveError("Cell already taken")
+            player = game.current_player
+            if symbol != game.symbols[player]:
+                raise MoveError("Not your turn")
+            if game.first_move_region(player) and not game.is_move_allowed(player, row, col):
+                row_min, row_max, col_min, col_max = game.player_limits[player]
+                raise MoveError(f"First move must be in rows {row_min + 1}-{row_max}, "
+                                f"columns {game.column_labels[col_min]}-{game.column_labels[col_max - 1]}")
+            game.play(index)
+            if game.check_winner(row, col):
+                self.winner = symbol
+            if self.listeners:
+                message = json.dumps({'type': 'move', 'room': self.id, 'seq': game.moves_played, 'row': row, 'col': col,
+                                      'symbol': symbol, 'turn': game.symbols[game.current_player] if self.winner is None
+                                      else None, 'winner': self.winner})
+                for listener in self.listeners:
+                    listener(message)
+            self.changed.notify_all()
+            return self.winner, game.moves_played
+
+    def _state(self, encoding='json'):
+        game = self.game
+        return {
+            'room': self.id,
+            'players': game.players,
+            'win_condition': game.win_condition,
+            'board': encode_board(game.board, game.history, game.players, encoding),  # See wire.py
+            'encoding': encoding,
+            'turn': game.symbols[game.current_player] if self.winner is None else None,
+            'seq': game.moves_played,  # Sequence number of the newest move
+            'winner': self.winner,
+        }
+
+    def _delta(self, since):
+        game = self.game
+        if not (type(since) is int and 0 <= since <= game.moves_played):
+            raise ValueError(f"since must be a sequence number from 0 to {game.moves_played}")
+        return {
+            'room': self.id,
+            'since': since,
+            'seq': game.moves_played,
+            # [row, col] of moves since+1 .. seq; move n was played by symbols[(n - 1) % players]
+            'moves': [divmod(index, game.size) for index in game.history[since:]],
+            'turn': game.symbols[game.current_player] if self.winner is None else None,
+            'winner': self.winner,
+            'closed': self.closed,
+        }
+
+    def moves_since(self, since):
+        """The moves after sequence number since, with the turn and winner now.  Raises ValueError for a bad since."""
+        with self.lock:
+            return self._delta(since)
+
+    def wait_since(self, since, timeout=MAX_WAIT):
+        """Like moves_since, but first wait up to timeout seconds for a move after since (or the room closing)."""
+        with self.changed:
+            self._delta(since)  # Refuse a bad since before waiting
+            self.changed.wait_for(lambda: self.game.moves_played > since or self.closed, min(timeout, MAX_WAIT))
+            return self._delta(since)
+
+    def state(self, encoding='json'):
+        with self.lock:
+            return self._state(encoding)
+
+    def position(self):
+        """What an AI worker needs to rebuild the game: rules, limits, moves and whose turn it is."""
+        game = self.game
+        with self.lock:
+            if self.closed:
+                raise MoveError("Room is closed")
+            if self.winner is not None or game.moves_played == game.size * game.size:
+                raise MoveError("Game is over")
+            return {
+                'players': game.players,
+                'win_condition': game.win_condition,
+                'limits': dict(game.player_limits),
+                'moves': list(game.history),
+                'symbol': game.symbols[game.current_player],
+            }
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.thinking is not None:
+                self.thinking.cancel()  # Drops a search still waiting for a worker
+            message = json.dumps({'type': 'closed', 'room': self.id})
+            for listener in self.listeners:
+                listener(message)
+            self.listeners = []
+            self.changed.notify_all()
+
+
+class Rooms:
+    def __init__(self, max_rooms=MAX_ROOMS, idle=ROOM_IDLE):
+        self.rooms = {}
+        self.permanent = set()  # Ids of the rooms that are never closed
+        self.max_rooms = max_rooms
+        self.idle = idle
+        self.swept = time.monotonic()
+        self.lock = threading.Lock()  # Only for adding and removing rooms
+
+    def create(self, room_id=None, permanent=False, **options):
+        """Open a room; raises ValueError for bad options or a taken id, and Full if there are max_rooms rooms."""
+        room = Room(room_id or secrets.token_urlsafe(6), **options)
+        if time.monotonic() - self.swept >= EXPIRE_EVERY:
+            self.expire()
+        with self.lock:
+            if room.id in self.rooms:
+                raise ValueError(f"Room {room.id!r} already exists")
+            if len(self.rooms) >= self.max_rooms:
+                raise Full(f"The server hosts {len(self.rooms)} rooms already, try again later")
+            self.rooms[room.id] = room
+            if permanent:
+                self.permanent.add(room.id)
+        return room
+
+    def get(self, room_id):
+        room = self.rooms.get(room_id)  # A single dict read needs no lock
+        if room is not None:
+            room.used = time.monotonic()
+        return room
+
+    def close(self, room_id):
+        """Close and forget a room; returns it, or None if there is no such room.  Raises ValueError if permanent."""
+        with self.lock:
+            if room_id in self.permanent:
+                raise ValueError(f"Room {room_id!r} cannot be closed")
+            room = self.rooms.pop(room_id, None)
+        if room is not None:
+            room.close()
+        return room
+
+    def expire(self):
+        """Close the rooms nobody has asked for in idle seconds and nobody is watching."""
+        now = time.monotonic()
+        with self.lock:
+            self.swept = now
+            idle = [room for room in self.rooms.values() if now - room.used >= self.idle and not room.listeners
+                    and room.id not in self.permanent]
+            for room in idle:
+                del self.rooms[room.id]
+        for room in idle:
+            room.close()
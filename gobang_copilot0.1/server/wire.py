@@ -0,0 +1,135 @@
+"""
+Encodings of the board in server responses.
+
+The board of a room can be sent four ways; the rest of the message stays
+JSON either way:
+
+    json    15 lists of 15 one-character strings (the default)
+    string  one 225-character string, row by row: "......X.O..."
+    packed  the cells as 2-bit numbers (3-bit with four players), 0 for an
+            empty cell and 1-4 for the players in turn order, packed row by
+            row from the high bit down and base64-encoded: 76 characters
+            for 15x15 and up to three players, 116 for four
+    moves   the cell index (row * 15 + col) of every stone in the order
+            they were played; stone n belongs to player n % players
+
+An HTTP client picks one with its Accept header, e.g.
+Accept: application/vnd.gobang.packed+json, and gets the same media type
+back as the Content-Type; plain application/json (or no Accept header) keeps
+the list of lists.  WebSocket clients add board=<name> to the URL.  Every
+message with a board says which encoding it uses in its "encoding" field.
+
+    python wire.py
+
+compares the size and the encode and decode times of the four encodings.
+"""
+
+import base64
+import json
+import time
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'string': 'application/vnd.gobang.string+json',
+    'packed': 'application/vnd.gobang.packed+json',
+    'moves': 'application/vnd.gobang.moves+json',
+}
+EMPTY = '.'
+SYMBOLS = ['X', 'O', '#', '@']  # Player order, as in the engine
+_DIGITS = str.maketrans({symbol: str(number) for number, symbol in enumerate([EMPTY] + SYMBOLS)})
+_CELLS = str.maketrans({str(number): symbol for number, symbol in enumerate([EMPTY] + SYMBOLS)})
+_CELL_PAIRS = str.maketrans({format(number, 'x'): ([EMPTY] + SYMBOLS)[number >> 2] + ([EMPTY] + SYMBOLS)[number & 3]
+                             for number in range(16)})
+
+
+def negotiate(accept):
+    """The encoding the client's Accept header (a werkzeug MIMEAccept) prefers; 'json' if none is acceptable."""
+    best = accept.best_match(list(MEDIA_TYPES.values()), default=MEDIA_TYPES['json'])
+    return next(name for name, media_type in MEDIA_TYPES.items() if media_type == best)
+
+
+def cell_bits(players):
+    return 2 if players < 4 else 3
+
+
+def encode_board(board, history, players, encoding='json'):
+    """board as a list of rows of symbols, history as the cell indices played, oldest first."""
+    if encoding == 'json':
+        return [list(row) for row in board]
+    if encoding == 'string':
+        return ''.join(''.join(row) for row in board)
+    if encoding == 'moves':
+        return list(history)
+    if encoding == 'packed':
+        bits = cell_bits(players)
+        digits = ''.join(''.join(row) for row in board).translate(_DIGITS)  # One base-4 or base-8 digit per cell
+        pad = -len(digits) * bits % 8  # Zero bits after the last cell, to fill the last byte
+        return base64.b64encode((int(digits, 2 ** bits) << pad).to_bytes((len(digits) * bits + pad) // 8, 'big')
+                                ).decode('ascii')
+    raise ValueError(f"Unknown board encoding {encoding!r}")
+
+
+def decode_board(value, encoding, players, size=15):
+    """The list of rows of symbols back from any encoding."""
+    if encoding == 'json':
+        return value
+    if encoding == 'string':
+        return [list(value[row * size:(row + 1) * size]) for row in range(size)]
+    if encoding == 'moves':
+        board = [[EMPTY] * size for _ in range(size)]
+        for number, index in enumerate(value):
+            board[index // size][index % size] = SYMBOLS[number % players]
+        return board
+    if encoding == 'packed':
+        bits = cell_bits(players)
+        data = base64.b64decode(value)
+        number = int.from_bytes(data, 'big') >> (len(data) * 8 - size * size * bits)
+        if bits == 3:
+            cells = format(number, 'o').zfill(size * size).translate(_CELLS)
+        else:  # Two cells per hex digit, and an extra empty cell in front when the count is odd
+            cells = format(number, 'x').zfill((size * size + 1) // 2).translate(_CELL_PAIRS)[-size * size:]
+        return [list(cells[row * size:(row + 1) * size]) for row in range(size)]
+    raise ValueError(f"Unknown board encoding {encoding!r}")
+
+
+def _sample(players, stones, seed=1, size=15):
+    import random
+    rng = random.Random(seed)
+    board = [[EMPTY] * size for _ in range(size)]
+    history = rng.sample(range(size * size), stones)
+    for number, index in enumerate(history):
+        board[index // size][index % size] = SYMBOLS[number % players]
+    return board, history
+
+
+def _time(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def benchmark(repeat=2000):
+    """Print the size of a whole state message and the time to build and read it with each encoding."""
+    print(f"{'players':>7} {'stones':>6} {'encoding':>8} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+    for players, stones in ((2, 0), (2, 40), (2, 120), (4, 40), (4, 200)):
+        board, history = _sample(players, stones)
+        for encoding in MEDIA_TYPES:
+            def encode():
+                return json.dumps({'type': 'state', 'room': 'abcdefgh', 'players': players, 'win_condition': 5,
+                                   'board': encode_board(board, history, players, encoding), 'encoding': encoding,
+                                   'turn': 'X', 'seq': stones, 'winner': None})
+
+            text = encode()
+
+            def decode():
+                message = json.loads(text)
+                return decode_board(message['board'], message['encoding'], message['players'])
+
+            assert decode() == board
+            print(f"{players:>7} {stones:>6} {encoding:>8} {len(text):>6} "
+                  f"{_time(encode, repeat):>10.1f} {_time(decode, repeat):>10.1f}")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,161 @@
+"""
+WebSocket transport for the rooms: moves come in, every accepted move is
+pushed to everyone in the room.
+
+    python ws.py --port 8765 --http-port 5000
+
+Both servers run in one process and share the rooms of app.py: the Flask
+app in a thread, the WebSocket server on an asyncio event loop.  Moves made
+over HTTP are pushed to the WebSocket clients too.
+
+A client connects to ws://host:8765/rooms/<id>?symbol=X to play as X, or
+without symbol to watch, and may add board=string, packed or moves for a
+compact board (see wire.py).  It first receives {"type": "state", ...} with
+the room's state, then {"type": "move", ...} with the move, its seq, the
+turn and the winner after every accepted move, and {"type": "closed"} when
+the room is closed.  It plays by sending {"row": 7, "col": 7}; a refused
+move is answered with {"type": "error", "message": ...} to that client only.
+
+A client that reconnects adds since=<the last seq it saw> to the URL and
+gets {"type": "moves", ...} with just the moves it missed (see
+Room.moves_since) instead of the whole state.  Either way a move that
+arrives while the first message is being sent may come again after it;
+clients skip moves whose seq they already have.
+
+Each move is serialised once by the room and handed to websockets'
+broadcast(), which writes the same frame to every subscriber without
+awaiting any of them, so one slow client never holds up the others.
+Anything that takes a room's lock runs in a thread rather than on the
+event loop.  When the room closes, its sockets are closed with code 1001.
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from websockets.asyncio.server import broadcast, serve
+
+from app import app, rooms
+from rooms import MoveError
+from wire import MEDIA_TYPES
+
+channels = {}  # Room id -> Channel, while anyone is connected to the room
+
+
+class Channel:
+    """The connections to one room, fed by a listener on the room."""
+
+    def __init__(self, room, loop):
+        self.room = room
+        self.loop = loop
+        self.connections = set()
+        # Whether the listener got on the room before it closed; awaited by everyone who joins meanwhile
+        self.subscribed = asyncio.ensure_future(asyncio.to_thread(self.subscribe))
+
+    def subscribe(self):
+        # In a thread: takes the room lock
+        with self.room.lock:
+            if self.room.closed:
+                return False
+            self.room.listeners.append(self.push)
+            return True
+
+    def push(self, message):
+        # Called from a worker thread under the room lock, so messages are queued on the loop in move order
+        self.loop.call_soon_threadsafe(self.deliver, message, self.room.closed)
+
+    def deliver(self, message, closed):
+        broadcast(self.connections, message)
+        if closed:  # The room is gone: say goodbye to everyone and forget the channel
+            for connection in self.connections:
+                asyncio.create_task(connection.close(1001, "Room closed"))
+            if channels.get(self.room.id) is self:
+                del channels[self.room.id]
+
+    def unsubscribe(self):
+        # In a thread: takes the room lock
+        with self.room.lock:
+            if self.push in self.room.listeners:
+                self.room.listeners.remove(self.push)
+
+
+async def join(room, connection):
+    """Subscribe connection to room's moves; returns its Channel, or None if the room is already closed."""
+    channel = channels.get(room.id)
+    if channel is None:
+        channel = channels[room.id] = Channel(room, asyncio.get_running_loop())
+    channel.connections.add(connection)
+    if not await channel.subscribed:
+        await leave(channel, connection)
+        return None
+    return channel
+
+
+async def leave(channel, connection):
+    channel.connections.discard(connection)
+    if not channel.connections:
+        if channels.get(channel.room.id) is channel:
+            del channels[channel.room.id]
+        if await channel.subscribed:
+            await asyncio.to_thread(channel.unsubscribe)
+
+
+async def handler(connection):
+    url = urlsplit(connection.request.path)
+    parts = url.path.strip('/').split('/')
+    room = rooms.get(parts[1]) if len(parts) == 2 and parts[0] == 'rooms' else None
+    if room is None:
+        await connection.close(1008, "No such room")
+        return
+    query = parse_qs(url.query)
+    symbol = query.get('symbol', [None])[0]
+    channel = await join(room, connection)
+    if channel is None:
+        await connection.close(1001, "Room closed")
+        return
+    try:
+        try:
+            since = int(query['since'][0]) if 'since' in query else None
+            encoding = query.get('board', ['json'])[0]
+            if encoding not in MEDIA_TYPES:
+                raise ValueError(f"board must be one of {', '.join(MEDIA_TYPES)}")
+            if since is None:
+                first = {'type': 'state', **await asyncio.to_thread(room.state, encoding)}
+            else:
+                first = {'type': 'moves', **await asyncio.to_thread(room.moves_since, since)}
+        except ValueError as error:
+            await connection.close(1008, str(error))
+            return
+        await connection.send(json.dumps(first))
+        async for text in connection:
+            try:
+                data = json.loads(text)
+                if symbol is None:
+                    raise MoveError("Spectators cannot move")
+                if not isinstance(data, dict):
+                    raise MoveError("Send a move as {\"row\": ..., \"col\": ...}")
+                # In a thread: waiting for a busy room's lock must not hold up the other rooms' sockets
+                await asyncio.to_thread(room.move, data.get('row'), data.get('col'), symbol)
+            except ValueError as error:  # Bad JSON or a refused move
+                await connection.send(json.dumps({'type': 'error', 'message': str(error)}))
+    finally:
+        await leave(channel, connection)
+
+
+async def main(host, port):
+    async with serve(handler, host, port, max_size=2 ** 12) as server:  # Moves are tiny
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gobang WebSocket server, with the HTTP API alongside")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--http-port', type=int, default=5000, help="port of the Flask app, 0 for none")
+    args = parser.parse_args()
+    if args.http_port:
+        threading.Thread(target=app.run, daemon=True,
+                         kwargs={'host': args.host, 'port': args.http_port, 'threaded': True}).start()
+    asyncio.run(main(args.host, args.port))